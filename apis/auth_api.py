@@ -2,21 +2,103 @@
 Authentication API - Registration and Login endpoints
 """
 
+import base64
+import hashlib
+import hmac
 import logging
-import secrets
-from flask import Blueprint, request, jsonify
+import os
+import threading
+import time
+from cachetools import TTLCache
+from flask import Blueprint, g, request, jsonify
 from models.user import User
-from auth.password import hash_password, verify_password
+from auth.password import (hash_password, hash_password_bounded,
+                           verify_password_bounded, needs_rehash, PasswordHasherBusy)
 from auth.jwt_handler import jwt_handler
 from middlewares.auth_middleware import token_required
+from middlewares.rate_limit import rate_limiter, login_rate_key
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+# Required request fields, in the order they are reported when missing
+_REGISTER_REQUIRED_FIELDS = ('username', 'password', 'organization_name', 'location', 'size')
+_REGISTER_REQUIRED = frozenset(_REGISTER_REQUIRED_FIELDS)
+
+# Short-lived cache of successful password verifications so repeated logins
+# skip the KDF. Keys are an HMAC over the credentials and the stored hash, so
+# a password change invalidates entries; failed attempts are never cached.
+_LOGIN_CACHE_PEPPER = os.getenv('LOGIN_CACHE_PEPPER', '').encode('utf-8') or os.urandom(32)
+_LOGIN_CACHE = TTLCache(maxsize=4096, ttl=int(os.getenv('LOGIN_CACHE_TTL', 45)))
+_LOGIN_CACHE_LOCK = threading.Lock()
+
+
+def _login_cache_key(username: str, password: str, hashed: str) -> bytes:
+    """Build the login cache key without keeping the plain password around"""
+    message = f"{username}\0{password}\0{hashed}".encode('utf-8')
+    return hmac.new(_LOGIN_CACHE_PEPPER, message, hashlib.sha256).digest()
+
+
+# Usernames that recently failed lookup, so credential-stuffing floods of
+# unknown names stop reaching MongoDB. Other workers do not see a registration
+# that happens in this one, so the cache is dropped whenever the user count
+# changes (checked at most once per _BAD_USERS_SYNC_INTERVAL).
+_BAD_USERS = TTLCache(maxsize=100_000, ttl=int(os.getenv('LOGIN_BAD_USER_TTL', 60)))
+_BAD_USERS_LOCK = threading.Lock()
+_BAD_USERS_SYNC_INTERVAL = 1.0
+_bad_users_synced_at = 0.0
+_bad_users_user_count = None
+
+# Built once at import (before gunicorn forks with preload), never per request
+_DUMMY_HASH = hash_password('intellilot-timing-dummy')
+
+
+def _dummy_verify(password: str):
+    """
+    Run a throwaway password check so unknown usernames take as long as real ones
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated, exactly as a
+            real verification would, so the response can't reveal which
+            usernames exist
+    """
+    # Same bounded pool as real verifications, so floods of unknown names
+    # cannot run unlimited concurrent KDFs
+    verify_password_bounded(password, _DUMMY_HASH)
+
+
+def _busy_response():
+    """503 for a saturated hashing pool, shared by known and unknown usernames"""
+    logger.warning("Login rejected: password hashing pool saturated")
+    return jsonify({'error': 'Server busy, please retry shortly'}), 503
+
+
+def _is_known_bad_user(username: str) -> bool:
+    """Whether the username recently failed lookup and no user has registered since"""
+    global _bad_users_synced_at, _bad_users_user_count
+    with _BAD_USERS_LOCK:
+        if username not in _BAD_USERS:
+            return False
+
+        now = time.monotonic()
+        if now - _bad_users_synced_at < _BAD_USERS_SYNC_INTERVAL:
+            return True
+        _bad_users_synced_at = now
+
+    # A metadata read, far cheaper than the lookup the cache saves
+    user_count = User.estimated_count()
+    with _BAD_USERS_LOCK:
+        if user_count != _bad_users_user_count:
+            # A registration (possibly in another worker) may have added this name
+            _BAD_USERS.clear()
+            _bad_users_user_count = user_count
+        return username in _BAD_USERS
+
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limiter.limit(os.getenv('REGISTER_RATE_LIMIT', '10/hour'))
 def register():
     """
     Register a new parking owner account
@@ -35,12 +117,10 @@ def register():
         data = request.get_json()
 
         # Validate required fields
-        required_fields = ['username', 'password',
-                           'organization_name', 'location', 'size']
-        missing_fields = [
-            field for field in required_fields if field not in data]
+        missing = _REGISTER_REQUIRED - data.keys()
 
-        if missing_fields:
+        if missing:
+            missing_fields = [field for field in _REGISTER_REQUIRED_FIELDS if field in missing]
             return jsonify({
                 'error': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
@@ -59,8 +139,12 @@ def register():
         if User.username_exists(username):
             return jsonify({'error': 'Username already exists'}), 409
 
-        # Hash password
-        hashed_password = hash_password(password)
+        # Hash password off the request thread; shed load when saturated
+        try:
+            hashed_password = hash_password_bounded(password)
+        except PasswordHasherBusy:
+            logger.warning("Registration rejected: password hashing pool saturated")
+            return jsonify({'error': 'Server busy, please retry shortly'}), 503
 
         # Create user
         user = User.create(
@@ -73,8 +157,10 @@ def register():
             details=data.get('details', {})
         )
 
-        logger.info(
-            f"✅ New user registered: {username} (ID: {user['user_id']})")
+        with _BAD_USERS_LOCK:
+            _BAD_USERS.pop(username, None)
+
+        logger.info("✅ New user registered: %s (ID: %s)", username, user['user_id'])
 
         return jsonify({
             'success': True,
@@ -85,7 +171,7 @@ def register():
         }), 201
 
     except Exception as e:
-        logger.error(f"Registration error: {e}", exc_info=True)
+        logger.exception("Registration error: %s", e)
         return jsonify({
             'success': False,
             'error': 'Registration failed',
@@ -94,6 +180,7 @@ def register():
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limiter.limit(os.getenv('LOGIN_RATE_LIMIT', '5/minute;20/hour'), key_func=login_rate_key)
 def login():
     """
     Login to parking owner account
@@ -113,19 +200,52 @@ def login():
         username = data['username'].strip()
         password = data['password']
 
-        # Find user
-        user = User.find_by_username(username)
+        # Reject recently unknown usernames without a database roundtrip
+        if _is_known_bad_user(username):
+            user = None
+        else:
+            user = User.find_by_username(username)
+            if not user:
+                with _BAD_USERS_LOCK:
+                    _BAD_USERS[username] = True
+
         if not user:
+            try:
+                _dummy_verify(password)
+            except PasswordHasherBusy:
+                return _busy_response()
             return jsonify({'error': 'Invalid username or password'}), 401
 
-        # Verify password
-        if not verify_password(password, user['password']):
-            return jsonify({'error': 'Invalid username or password'}), 401
+        # Verify password (recent successful verifications skip the KDF)
+        cache_key = _login_cache_key(username, password, user['password'])
+        with _LOGIN_CACHE_LOCK:
+            cached = _LOGIN_CACHE.get(cache_key) == user['user_id']
+
+        if not cached:
+            # Verify off the request thread; shed load when saturated
+            try:
+                valid = verify_password_bounded(password, user['password'])
+            except PasswordHasherBusy:
+                return _busy_response()
+            if not valid:
+                return jsonify({'error': 'Invalid username or password'}), 401
 
         # Check account status
         if user.get('status') != 'active':
             return jsonify({'error': 'Account is not active'}), 403
 
+        if not cached:
+            with _LOGIN_CACHE_LOCK:
+                _LOGIN_CACHE[cache_key] = user['user_id']
+
+            # Upgrade legacy bcrypt or outdated Argon2 hashes while we have the password
+            if needs_rehash(user['password']):
+                try:
+                    User.update_password_hash(
+                        user['user_id'], hash_password_bounded(password))
+                except PasswordHasherBusy:
+                    pass  # Retried on a later login
+
         # Generate JWT token
         access_token = jwt_handler.create_token(
             user_id=user['user_id'],
@@ -138,7 +258,7 @@ def login():
         # Update last login
         User.update_last_login(user['user_id'])
 
-        logger.info(f"✅ User logged in: {username}")
+        logger.info("✅ User logged in: %s", username)
 
         return jsonify({
             'success': True,
@@ -150,7 +270,7 @@ def login():
         }), 200
 
     except Exception as e:
-        logger.error(f"Login error: {e}", exc_info=True)
+        logger.exception("Login error: %s", e)
         return jsonify({
             'success': False,
             'error': 'Login failed',
@@ -169,7 +289,7 @@ def get_profile():
         Authorization: Bearer <token>
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
         user = User.find_by_user_id(user_id)
 
         if not user:
@@ -182,7 +302,7 @@ def get_profile():
         return jsonify(user), 200
 
     except Exception as e:
-        logger.error(f"Profile error: {e}", exc_info=True)
+        logger.exception("Profile error: %s", e)
         return jsonify({'error': 'Failed to load profile'}), 500
 
 
@@ -197,7 +317,7 @@ def get_credentials():
         Authorization: Bearer <token>
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
         credentials = User.get_user_credentials(user_id)
 
         # Convert ObjectId to string for each credential
@@ -208,7 +328,7 @@ def get_credentials():
         return jsonify(credentials), 200
 
     except Exception as e:
-        logger.error(f"Get credentials error: {e}", exc_info=True)
+        logger.exception("Get credentials error: %s", e)
         return jsonify({'error': 'Failed to load credentials'}), 500
 
 
@@ -225,7 +345,7 @@ def generate_credential():
         - name (required): Name/description for the credential
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
         data = request.get_json()
 
         if not data or 'name' not in data:
@@ -235,8 +355,8 @@ def generate_credential():
         if not name:
             return jsonify({'error': 'Name cannot be empty'}), 400
 
-        # Generate secure API key
-        api_key = secrets.token_urlsafe(48)
+        # Generate secure API key (48 random bytes -> 64 URL-safe chars, no padding)
+        api_key = base64.urlsafe_b64encode(os.urandom(48)).decode('ascii')
 
         # Create credential
         credential = User.create_api_credential(
@@ -249,7 +369,7 @@ def generate_credential():
         if '_id' in credential:
             credential['_id'] = str(credential['_id'])
 
-        logger.info(f"✅ API credential generated for user {user_id}: {name}")
+        logger.info("✅ API credential generated for user %s: %s", user_id, name)
 
         return jsonify({
             'success': True,
@@ -257,7 +377,7 @@ def generate_credential():
         }), 201
 
     except Exception as e:
-        logger.error(f"Generate credential error: {e}", exc_info=True)
+        logger.exception("Generate credential error: %s", e)
         return jsonify({'error': 'Failed to generate credential'}), 500
 
 
@@ -272,18 +392,18 @@ def revoke_credential(credential_id):
         Authorization: Bearer <token>
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
 
         success = User.revoke_credential(user_id, credential_id)
 
         if success:
-            logger.info(f"API credential revoked: {credential_id}")
+            logger.info("API credential revoked: %s", credential_id)
             return jsonify({'success': True, 'message': 'Credential revoked'}), 200
         else:
             return jsonify({'error': 'Credential not found'}), 404
 
     except Exception as e:
-        logger.error(f"Revoke credential error: {e}", exc_info=True)
+        logger.exception("Revoke credential error: %s", e)
         return jsonify({'error': 'Failed to revoke credential'}), 500
 
 
@@ -298,18 +418,18 @@ def activate_credential(credential_id):
         Authorization: Bearer <token>
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
 
         success = User.activate_credential(user_id, credential_id)
 
         if success:
-            logger.info(f"API credential activated: {credential_id}")
+            logger.info("API credential activated: %s", credential_id)
             return jsonify({'success': True, 'message': 'Credential activated'}), 200
         else:
             return jsonify({'error': 'Credential not found'}), 404
 
     except Exception as e:
-        logger.error(f"Activate credential error: {e}", exc_info=True)
+        logger.exception("Activate credential error: %s", e)
         return jsonify({'error': 'Failed to activate credential'}), 500
 
 
@@ -324,16 +444,16 @@ def delete_credential(credential_id):
         Authorization: Bearer <token>
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
 
         success = User.delete_credential(user_id, credential_id)
 
         if success:
-            logger.info(f"API credential deleted: {credential_id}")
+            logger.info("API credential deleted: %s", credential_id)
             return jsonify({'success': True, 'message': 'Credential deleted'}), 200
         else:
             return jsonify({'error': 'Credential not found'}), 404
 
     except Exception as e:
-        logger.error(f"Delete credential error: {e}", exc_info=True)
+        logger.exception("Delete credential error: %s", e)
         return jsonify({'error': 'Failed to delete credential'}), 500
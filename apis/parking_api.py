@@ -2,24 +2,115 @@
 Parking API - Detection and data management endpoints
 """
 
-import json
+import functools
 import logging
+import os
+import threading
+import time
 from datetime import datetime
-from flask import Blueprint, request, jsonify
+from cachetools import LRUCache
+from flask import Blueprint, current_app, g, request, jsonify
 from middlewares.auth_middleware import token_required, api_key_or_token_required
-from auth.jwt_handler import jwt_handler
 from models.parking_data import ParkingData
+from models.camera_layout import CameraLayout
 from config.database import db
-from utils.image_utils import decode_image, validate_coordinates, get_image_dimensions
+from utils.image_utils import decode_image, decode_base64_image, decompress_body, read_upload_buffer, validate_coordinates, get_image_dimensions
 from utils.svg_generator import generate_svg, generate_slot_details
 from utils.gcs_storage import gcs_storage
-from parking_detection import ParkingDetectionSystem
+from utils import json_utils
+from utils.json_utils import json_response
+from parking_detection import ParkingDetectionSystem, DetectionBatcher
+
+try:
+    from ciso8601 import parse_datetime
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 parking_bp = Blueprint('parking', __name__, url_prefix='/parking')
 
+# Required request fields, in the order they are reported when missing
+_UPDATE_REQUIRED_FIELDS = ('camera_id', 'total_slots', 'occupied_slots', 'empty_slots', 'occupancy_rate')
+_UPDATE_REQUIRED = frozenset(_UPDATE_REQUIRED_FIELDS)
+_BITMAP_UPDATE_REQUIRED_FIELDS = ('camera_id', 'layout_id', 'occupied_bitmap')
+_BITMAP_UPDATE_REQUIRED = frozenset(_BITMAP_UPDATE_REQUIRED_FIELDS)
+_MAX_BATCH_UPDATES = int(os.getenv('PARKING_MAX_BATCH_UPDATES', 500))
+
+# Fields /parking/images returns; slots_details, coordinates and svg are left in MongoDB
+_IMAGE_PROJECTION = {
+    '_id': 1, 'timestamp': 1, 'camera_id': 1, 'node_id': 1, 'source': 1,
+    'total_slots': 1, 'occupied_slots': 1, 'empty_slots': 1, 'occupancy_rate': 1,
+    'total_cars_detected': 1, 'processing_time_ms': 1, 'image_dimensions': 1,
+    'gcs_storage': 1
+}
+
+# Edge updates are acknowledged before they reach MongoDB and written in batches
+_DEFER_EDGE_WRITES = os.getenv('PARKING_UPDATE_DEFERRED_WRITES', 'true').lower() == 'true'
+
+# Detection systems are reused per camera so the detector is not rebuilt on
+# every request; the least recently used cameras are evicted first.
+_SYSTEM_CACHE = LRUCache(maxsize=int(os.getenv('DETECTION_SYSTEM_CACHE_SIZE', 64)))
+_SYSTEM_CACHE_LOCK = threading.RLock()
+
+# Detection for concurrent requests in this worker shares one forward pass;
+# slot occupancy and annotation stay per request
+_DETECTION_BATCHER = DetectionBatcher(
+    max_batch=int(os.getenv('DETECTION_BATCH_SIZE', 16)),
+    max_wait_ms=float(os.getenv('DETECTION_BATCH_WAIT_MS', 8))
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO 8601 query parameter (accepts a trailing Z); repeated paging reuses results"""
+    if CISO8601_AVAILABLE:
+        return parse_datetime(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _get_detection_system(cache_key, parking_rectangles):
+    """
+    Get the cached detection system for a camera, creating it on first use
+
+    Callers must hold system.lock while updating positions and processing.
+    """
+    with _SYSTEM_CACHE_LOCK:
+        system = _SYSTEM_CACHE.get(cache_key)
+        if system is None:
+            system = ParkingDetectionSystem(parking_positions=parking_rectangles)
+            _SYSTEM_CACHE[cache_key] = system
+        return system
+
+
+def _wait_for_upload(upload, label: str):
+    """
+    Wait for a background GCS upload
+
+    Args:
+        upload: Future from gcs_storage.*_async, or None if nothing was uploaded
+        label: Image description for logging
+
+    Returns:
+        Tuple of (blob_path, url), or (None, None) if skipped or failed
+    """
+    if upload is None:
+        return None, None
+
+    try:
+        result = upload.result()
+    except Exception as e:
+        logger.error("⚠️ Failed to upload %s image to GCS: %s", label.lower(), e)
+        return None, None
+
+    if not result:
+        return None, None
+
+    logger.info("✅ %s image uploaded to GCS: %s", label, result[0])
+    return result
+
 
 @parking_bp.route('/updateRaw', methods=['POST'])
 @api_key_or_token_required
@@ -35,10 +126,19 @@ def update_raw():
         - coordinates: JSON array [[x1,y1,x2,y2], ...]
         - camera_id: string (used as node_id)
         - node_id: string (optional, defaults to camera_id)
+    Body (raw image/jpeg or application/octet-stream):
+        - the encoded image itself; camera_id and node_id go in the query
+          string and coordinates in the X-Coordinates header. Header fields
+          are capped at 8190 bytes by gunicorn/nginx and the request line at
+          4094, so large layouts must use the multipart form instead
+        - may be sent with Content-Encoding: zstd or gzip
+    Query:
+        - async: "1" to queue the MongoDB write and return 202 without waiting for it
     """
     try:
-        # Get user ID from JWT or API key
-        user_id = jwt_handler.get_current_user_id()
+        # User ID resolved by the auth decorator (JWT or API key)
+        user_id = g.user_id
+        deferred_write = request.args.get('async') == '1'
 
         # Variables to store image data
         image = None
@@ -51,22 +151,45 @@ def update_raw():
             if 'image' not in data:
                 return jsonify({'error': 'Missing image parameter'}), 400
 
-            image = decode_image(data['image'])
+            # Decode base64 once; the bytes feed both the decoder and the raw
+            # upload, and popping drops the large string from the parsed body
+            image_bytes = decode_base64_image(data.pop('image'))
+            image = decode_image(image_bytes)
             coordinates = data.get('coordinates')
             camera_id = data.get('camera_id')
             # Use node_id or fall back to camera_id
             node_id = data.get('node_id', camera_id)
 
+        elif request.mimetype in ('image/jpeg', 'application/octet-stream'):
+            # Raw image body: no multipart framing to parse or copy
+            image_bytes = request.get_data(cache=False)
+            if not image_bytes:
+                return jsonify({'error': 'Missing image body'}), 400
+            content_encoding = request.headers.get('Content-Encoding')
+            if content_encoding:
+                try:
+                    image_bytes = decompress_body(
+                        image_bytes, content_encoding, current_app.config['MAX_CONTENT_LENGTH'])
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+            image = decode_image(image_bytes)
+
+            coordinates = json_utils.loads(
+                request.headers.get('X-Coordinates') or request.args.get('coordinates', '[]'))
+            camera_id = request.args.get('camera_id')
+            # Use node_id or fall back to camera_id
+            node_id = request.args.get('node_id', camera_id)
+
         else:
             # Multipart form data
             if 'image' not in request.files:
                 return jsonify({'error': 'Missing image file'}), 400
 
             image_file = request.files['image']
-            image_bytes = image_file.read()
+            image_bytes = read_upload_buffer(image_file)
             image = decode_image(image_bytes)
 
-            coordinates = json.loads(request.form.get('coordinates', '[]'))
+            coordinates = json_utils.loads(request.form.get('coordinates', '[]'))
             camera_id = request.form.get('camera_id')
             # Use node_id or fall back to camera_id
             node_id = request.form.get('node_id', camera_id)
@@ -78,11 +201,9 @@ def update_raw():
         if not node_id:
             node_id = camera_id  # Ensure node_id is set
 
-        validate_coordinates(coordinates)
-
-        parking_rectangles = [tuple(coord) for coord in coordinates]
-        logger.info(
-            f"Processing raw image for user {user_id}, camera {camera_id}, node {node_id}")
+        parking_rectangles = validate_coordinates(coordinates)
+        logger.info("Processing raw image for user %s, camera %s, node %s",
+                    user_id, camera_id, node_id)
 
         # Current timestamp for all operations
         current_timestamp = datetime.utcnow()
@@ -90,66 +211,51 @@ def update_raw():
         # Get image dimensions
         image_dims = get_image_dimensions(image)
 
-        # Upload raw image to Google Cloud Storage
-        gcs_raw_path = None
-        gcs_raw_url = None
+        # Start the raw image upload to Google Cloud Storage; it runs while
+        # the frame goes through detection
+        raw_upload = None
         if gcs_storage.enabled:
-            try:
-                if image_bytes:
-                    # Upload bytes directly
-                    result = gcs_storage.upload_image_bytes(
-                        image_bytes=image_bytes,
-                        user_id=user_id,
-                        node_id=node_id,
-                        timestamp=current_timestamp,
-                        image_type="raw"
-                    )
-                else:
-                    # Upload OpenCV image
-                    result = gcs_storage.upload_image(
-                        image=image,
-                        user_id=user_id,
-                        node_id=node_id,
-                        timestamp=current_timestamp,
-                        image_type="raw"
-                    )
-
-                if result:
-                    gcs_raw_path, gcs_raw_url = result
-                    logger.info(f"✅ Raw image uploaded to GCS: {gcs_raw_path}")
-            except Exception as e:
-                logger.error(f"⚠️ Failed to upload raw image to GCS: {e}")
-
-        # Initialize detection system
-        system = ParkingDetectionSystem(parking_positions=parking_rectangles)
-
-        # Process frame
-        annotated_frame, statistics, processing_time = system.process_frame(
-            image)
-
-        # Upload annotated image to GCS
-        gcs_annotated_path = None
-        gcs_annotated_url = None
-        if gcs_storage.enabled and annotated_frame is not None:
-            try:
-                result = gcs_storage.upload_image(
-                    image=annotated_frame,
+            if image_bytes:
+                # Upload bytes directly
+                raw_upload = gcs_storage.upload_image_bytes_async(
+                    image_bytes=image_bytes,
                     user_id=user_id,
                     node_id=node_id,
                     timestamp=current_timestamp,
-                    image_type="annotated"
+                    image_type="raw"
                 )
-                if result:
-                    gcs_annotated_path, gcs_annotated_url = result
-                    logger.info(
-                        f"✅ Annotated image uploaded to GCS: {gcs_annotated_path}")
-            except Exception as e:
-                logger.error(
-                    f"⚠️ Failed to upload annotated image to GCS: {e}")
-
-        # Get detailed results
-        vehicle_detections = system.vehicle_detector.detect_vehicles(image)
-        occupancy = system.parking_manager.detect_occupancy(vehicle_detections)
+            else:
+                # Upload OpenCV image
+                raw_upload = gcs_storage.upload_image_async(
+                    image=image,
+                    user_id=user_id,
+                    node_id=node_id,
+                    timestamp=current_timestamp,
+                    image_type="raw"
+                )
+
+        # Reuse this camera's detection system
+        system = _get_detection_system((user_id, camera_id), parking_rectangles)
+
+        # Detect vehicles (batched with concurrent requests), then occupancy and annotation
+        start_time = time.time()
+        vehicle_detections = _DETECTION_BATCHER.detect(image)
+        with system.lock:
+            system.update_positions(parking_rectangles)
+            annotated_frame, statistics, _, vehicle_detections, occupancy = \
+                system.process_frame_full(image, vehicle_detections)
+        processing_time = time.time() - start_time
+
+        # Start the annotated image upload; it runs while the SVG is built
+        annotated_upload = None
+        if gcs_storage.enabled and annotated_frame is not None:
+            annotated_upload = gcs_storage.upload_image_async(
+                image=annotated_frame,
+                user_id=user_id,
+                node_id=node_id,
+                timestamp=current_timestamp,
+                image_type="annotated"
+            )
 
         # Generate slot details and SVG
         slots_details = generate_slot_details(parking_rectangles, occupancy)
@@ -160,6 +266,10 @@ def update_raw():
             image_dims['height']
         )
 
+        # The MongoDB record needs both GCS paths
+        gcs_raw_path, gcs_raw_url = _wait_for_upload(raw_upload, 'Raw')
+        gcs_annotated_path, gcs_annotated_url = _wait_for_upload(annotated_upload, 'Annotated')
+
         # Save to MongoDB with GCS paths
         document_id = ParkingData.create_from_raw_processing(
             user_id=user_id,
@@ -178,10 +288,12 @@ def update_raw():
             gcs_raw_image_url=gcs_raw_url,
             gcs_annotated_image_path=gcs_annotated_path,
             gcs_annotated_image_url=gcs_annotated_url,
-            timestamp=current_timestamp
+            timestamp=current_timestamp,
+            deferred=deferred_write
         )
 
-        logger.info(f"✅ Parking data saved: {document_id} for user {user_id}")
+        logger.info("✅ Parking data %s: %s for user %s",
+                    'queued' if deferred_write else 'saved', document_id, user_id)
 
         # Prepare response
         response = {
@@ -209,13 +321,124 @@ def update_raw():
             }
         }
 
-        return jsonify(response), 201
+        return json_response(response, 202 if deferred_write else 201)
 
     except Exception as e:
-        logger.error(f"Error in updateRaw: {e}", exc_info=True)
+        logger.exception("Error in updateRaw: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@parking_bp.route('/registerCamera', methods=['POST'])
+@api_key_or_token_required
+def register_camera():
+    """
+    Register a camera's slot coordinates so updates can send a bitmap instead
+
+    POST /parking/registerCamera
+    Headers:
+        - Authorization: Bearer <token_or_api_key>
+    Body (JSON):
+        - camera_id: string
+        - coordinates: JSON array [[x1,y1,x2,y2], ...]
+    """
+    try:
+        # User ID resolved by the auth decorator (JWT or API key)
+        user_id = g.user_id
+
+        data = request.get_json()
+
+        camera_id = data.get('camera_id')
+        if not camera_id:
+            return jsonify({'error': 'camera_id is required'}), 400
+
+        try:
+            coordinates = validate_coordinates(data.get('coordinates')).tolist()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        layout_id = CameraLayout.register(user_id, camera_id, coordinates)
+
+        logger.info("✅ Camera layout registered: %s (%d slots) for user %s",
+                    camera_id, len(coordinates), user_id)
+
+        return json_response({
+            'success': True,
+            'layout_id': layout_id,
+            'total_slots': len(coordinates)
+        }, 201)
+
+    except Exception as e:
+        logger.exception("Error in registerCamera: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _edge_update_fields(user_id: str, data: dict) -> dict:
+    """
+    Build ParkingData.create_from_edge_processing arguments from an edge update
+
+    Args:
+        user_id: User identifier
+        data: Full update, or compact update referring to a registered layout
+
+    Returns:
+        Keyword arguments for the record
+
+    Raises:
+        ValueError: If required fields are missing or malformed
+        LookupError: If a compact update names an unknown layout
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Update must be a JSON object')
+
+    if 'occupied_bitmap' not in data:
+        missing = _UPDATE_REQUIRED - data.keys()
+        if missing:
+            missing_fields = [field for field in _UPDATE_REQUIRED_FIELDS if field in missing]
+            raise ValueError(f'Missing required fields: {", ".join(missing_fields)}')
+
+        return {
+            'user_id': user_id,
+            'camera_id': data['camera_id'],
+            'total_slots': int(data['total_slots']),
+            'occupied_slots': int(data['occupied_slots']),
+            'empty_slots': int(data['empty_slots']),
+            'occupancy_rate': float(data['occupancy_rate']),
+            'total_cars_detected': data.get('total_cars_detected'),
+            'slots_details': data.get('slots_details', []),
+            'coordinates': data.get('coordinates', []),
+            'additional_data': data.get('additional_data', {})
+        }
+
+    missing = _BITMAP_UPDATE_REQUIRED - data.keys()
+    if missing:
+        missing_fields = [field for field in _BITMAP_UPDATE_REQUIRED_FIELDS if field in missing]
+        raise ValueError(f'Missing required fields: {", ".join(missing_fields)}')
+
+    layout = CameraLayout.find(user_id, data['layout_id'])
+    if layout is None or layout['camera_id'] != data['camera_id']:
+        raise LookupError('Unknown layout_id, register the camera first')
+
+    occupied_slots, slots_details = CameraLayout.expand_bitmap(
+        layout, data['occupied_bitmap'])
+
+    total_slots = layout['total_slots']
+    additional_data = data.get('additional_data', {})
+    additional_data['layout_id'] = layout['layout_id']
+
+    # Coordinates live in the layout, so they are not copied into every record
+    return {
+        'user_id': user_id,
+        'camera_id': data['camera_id'],
+        'total_slots': total_slots,
+        'occupied_slots': occupied_slots,
+        'empty_slots': total_slots - occupied_slots,
+        'occupancy_rate': round(occupied_slots / total_slots * 100, 2) if total_slots else 0.0,
+        'total_cars_detected': data.get('total_cars_detected'),
+        'slots_details': slots_details,
+        'additional_data': additional_data
+    }
+
+
 @parking_bp.route('/update', methods=['POST'])
 @api_key_or_token_required
 def update_processed():
@@ -232,50 +455,88 @@ def update_processed():
         - empty_slots: number
         - occupancy_rate: number
         - (optional) total_cars_detected, slots_details, coordinates, additional_data
+    Body (JSON, compact form for cameras registered via /parking/registerCamera):
+        - camera_id: string
+        - layout_id: string
+        - occupied_bitmap: base64 of the packed per-slot occupancy bits
+        - (optional) total_cars_detected, additional_data
     """
     try:
-        # Get user ID from JWT or API key
-        user_id = jwt_handler.get_current_user_id()
+        # User ID resolved by the auth decorator (JWT or API key)
+        user_id = g.user_id
 
         data = request.get_json()
 
-        # Validate required fields
-        required_fields = ['camera_id', 'total_slots',
-                           'occupied_slots', 'empty_slots', 'occupancy_rate']
-        missing_fields = [
-            field for field in required_fields if field not in data]
-
-        if missing_fields:
-            return jsonify({
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
+        try:
+            fields = _edge_update_fields(user_id, data)
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Save to MongoDB
         document_id = ParkingData.create_from_edge_processing(
-            user_id=user_id,
-            camera_id=data['camera_id'],
-            total_slots=int(data['total_slots']),
-            occupied_slots=int(data['occupied_slots']),
-            empty_slots=int(data['empty_slots']),
-            occupancy_rate=float(data['occupancy_rate']),
-            total_cars_detected=data.get('total_cars_detected'),
-            slots_details=data.get('slots_details', []),
-            coordinates=data.get('coordinates', []),
-            additional_data=data.get('additional_data', {})
-        )
+            **fields, deferred=_DEFER_EDGE_WRITES)
 
-        logger.info(
-            f"✅ Edge-processed data saved: {document_id} for user {user_id}")
+        logger.info("✅ Edge-processed data accepted: %s for user %s", document_id, user_id)
 
-        return jsonify({
+        return json_response({
             'success': True,
             'document_id': document_id,
             'message': 'Parking data updated successfully',
             'timestamp': datetime.utcnow().isoformat()
-        }), 201
+        }, 201)
 
     except Exception as e:
-        logger.error(f"Error in update: {e}", exc_info=True)
+        logger.exception("Error in update: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@parking_bp.route('/batchUpdate', methods=['POST'])
+@api_key_or_token_required
+def batch_update():
+    """
+    Store several edge updates (e.g. from a gateway serving many cameras) at once
+
+    POST /parking/batchUpdate
+    Headers:
+        - Authorization: Bearer <token_or_api_key>
+    Body (JSON):
+        - updates: array of /parking/update bodies (full or compact form)
+    """
+    try:
+        # User ID resolved by the auth decorator (JWT or API key)
+        user_id = g.user_id
+
+        updates = request.get_json().get('updates')
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'error': 'updates must be a non-empty list'}), 400
+        if len(updates) > _MAX_BATCH_UPDATES:
+            return jsonify({'error': f'At most {_MAX_BATCH_UPDATES} updates per batch'}), 400
+
+        records = []
+        for index, update in enumerate(updates):
+            try:
+                records.append(_edge_update_fields(user_id, update))
+            except LookupError as e:
+                return jsonify({'error': f'updates[{index}]: {e}'}), 404
+            except ValueError as e:
+                return jsonify({'error': f'updates[{index}]: {e}'}), 400
+
+        # One unordered insert_many for the whole batch
+        document_ids = ParkingData.create_many_from_edge_processing(records)
+
+        logger.info("✅ Edge batch accepted: %d records for user %s", len(document_ids), user_id)
+
+        return json_response({
+            'success': True,
+            'document_ids': document_ids,
+            'count': len(document_ids),
+            'timestamp': datetime.utcnow().isoformat()
+        }, 201)
+
+    except Exception as e:
+        logger.exception("Error in batchUpdate: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -296,8 +557,8 @@ def get_parking_data(user_id):
         - end_date (optional)
     """
     try:
-        # Get user ID from JWT
-        jwt_user_id = jwt_handler.get_current_user_id()
+        # User ID resolved by the auth decorator
+        jwt_user_id = g.user_id
 
         # Verify user has access
         if user_id != jwt_user_id:
@@ -313,10 +574,9 @@ def get_parking_data(user_id):
         end_date = request.args.get('end_date')
 
         if start_date:
-            start_date = datetime.fromisoformat(
-                start_date.replace('Z', '+00:00'))
+            start_date = _parse_iso(start_date)
         if end_date:
-            end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+            end_date = _parse_iso(end_date)
 
         # Query database
         result = ParkingData.find_by_user(
@@ -328,10 +588,10 @@ def get_parking_data(user_id):
             skip=skip
         )
 
-        logger.info(
-            f"📊 Retrieved {result['returned_count']} parking records for user {user_id}")
+        logger.info("📊 Retrieved %d parking records for user %s",
+                    result['returned_count'], user_id)
 
-        return jsonify({
+        return json_response({
             'success': True,
             'user_id': user_id,
             'total_count': result['total_count'],
@@ -340,10 +600,10 @@ def get_parking_data(user_id):
             'limit': limit,
             'latest': result['latest'],
             'data': result['data']
-        }), 200
+        })
 
     except Exception as e:
-        logger.error(f"Error retrieving parking data: {e}", exc_info=True)
+        logger.exception("Error retrieving parking data: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -362,9 +622,12 @@ def get_uploaded_images():
         - camera_id: Filter by camera ID (optional)
         - node_id: Filter by node ID (optional)
         - source: Filter by source (raw_processing or edge_processing) (optional)
+        - before: Only images older than this ISO timestamp (optional); pass
+          pagination.next_before to page without skip cost. Cursor pages
+          leave total_count/total_pages null.
     """
     try:
-        user_id = jwt_handler.get_current_user_id()
+        user_id = g.user_id
 
         # Parse query parameters
         page = max(1, int(request.args.get('page', 1)))
@@ -372,6 +635,7 @@ def get_uploaded_images():
         camera_id = request.args.get('camera_id')
         node_id = request.args.get('node_id')
         source = request.args.get('source')
+        before = request.args.get('before')
 
         # Build query
         query = {'user_id': user_id}
@@ -389,19 +653,28 @@ def get_uploaded_images():
         if source:
             query['source'] = source
 
-        # Get total count
-        total_count = db.parking_data.count_documents(query)
-
-        # Calculate pagination
+        # Calculate pagination; a timestamp cursor replaces skip for deep pages
+        # and skips the count, so cursor pages cost only the page itself
         skip = (page - 1) * limit
-        total_pages = (total_count + limit - 1) // limit
+        if before:
+            page_query = dict(query, timestamp={'$lt': _parse_iso(before)})
+            skip = 0
+            total_count = None
+            total_pages = None
+        else:
+            page_query = query
+            # Counted at most every 30s per filter combination
+            total_count = ParkingData.cached_count(
+                user_id, ('images', camera_id, node_id, source), query)
+            total_pages = (total_count + limit - 1) // limit
 
-        # Fetch data
-        cursor = db.parking_data.find(query).sort(
+        cursor = db.parking_data.find(page_query, _IMAGE_PROJECTION).sort(
             'timestamp', -1).skip(skip).limit(limit)
 
         images = []
+        last_timestamp = None
         for doc in cursor:
+            last_timestamp = doc['timestamp']
             gcs_storage_data = doc.get('gcs_storage', {})
             raw_image = gcs_storage_data.get(
                 'raw_image', {}) if gcs_storage_data else {}
@@ -410,7 +683,7 @@ def get_uploaded_images():
 
             images.append({
                 'id': str(doc['_id']),
-                'timestamp': doc['timestamp'].isoformat(),
+                'timestamp': doc['timestamp'],
                 'camera_id': doc.get('camera_id'),
                 'node_id': doc.get('node_id'),
                 'source': doc.get('source', 'unknown'),
@@ -425,7 +698,8 @@ def get_uploaded_images():
                 'image_dimensions': doc.get('image_dimensions')
             })
 
-        return jsonify({
+        # Timestamps are serialized as ISO 8601 by json_response
+        return json_response({
             'success': True,
             'images': images,
             'pagination': {
@@ -433,13 +707,15 @@ def get_uploaded_images():
                 'limit': limit,
                 'total_count': total_count,
                 'total_pages': total_pages,
-                'has_next': page < total_pages,
-                'has_prev': page > 1
+                'has_next': page < total_pages if total_pages is not None else len(images) == limit,
+                'has_prev': page > 1,
+                'next_before': last_timestamp.isoformat()
+                if last_timestamp and len(images) == limit else None
             }
         })
 
     except Exception as e:
-        logger.error(f"Error fetching images: {e}", exc_info=True)
+        logger.exception("Error fetching images: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -459,34 +735,34 @@ def basic_detect():
             data = request.get_json()
             if 'image' not in data:
                 return jsonify({'error': 'Missing image parameter'}), 400
-            image = decode_image(data['image'])
+            image = decode_image(data.pop('image'))
             coordinates = data.get('coordinates')
         else:
             if 'image' not in request.files:
                 return jsonify({'error': 'Missing image file'}), 400
             image_file = request.files['image']
-            image_bytes = image_file.read()
+            image_bytes = read_upload_buffer(image_file)
             image = decode_image(image_bytes)
-            coordinates = json.loads(request.form.get('coordinates', '[]'))
-
-        # Validate coordinates
-        validate_coordinates(coordinates)
+            coordinates = json_utils.loads(request.form.get('coordinates', '[]'))
 
-        parking_rectangles = [tuple(coord) for coord in coordinates]
+        # Validate coordinates (returns them as an (N, 4) int32 array)
+        parking_rectangles = validate_coordinates(coordinates)
 
         # Get image dimensions
         image_dims = get_image_dimensions(image)
 
-        # Initialize detection system
-        system = ParkingDetectionSystem(parking_positions=parking_rectangles)
-
-        # Process frame
-        annotated_frame, statistics, processing_time = system.process_frame(
-            image)
+        # Reuse the detection system for this slot layout
+        system = _get_detection_system(
+            ('detect', parking_rectangles.tobytes()), parking_rectangles)
 
-        # Get detailed results
-        vehicle_detections = system.vehicle_detector.detect_vehicles(image)
-        occupancy = system.parking_manager.detect_occupancy(vehicle_detections)
+        # Detect vehicles (batched with concurrent requests), then occupancy and annotation
+        start_time = time.time()
+        vehicle_detections = _DETECTION_BATCHER.detect(image)
+        with system.lock:
+            system.update_positions(parking_rectangles)
+            annotated_frame, statistics, _, vehicle_detections, occupancy = \
+                system.process_frame_full(image, vehicle_detections)
+        processing_time = time.time() - start_time
 
         # Generate slot details and SVG
         slots_details = generate_slot_details(parking_rectangles, occupancy)
@@ -510,8 +786,8 @@ def basic_detect():
             'processing_time_ms': round(processing_time * 1000, 2)
         }
 
-        return jsonify(response)
+        return json_response(response)
 
     except Exception as e:
-        logger.error(f"Error in basic detection: {e}", exc_info=True)
+        logger.exception("Error in basic detection: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2,8 +2,9 @@
 Web UI API - Serves HTML interface and health check
 """
 
+import hashlib
 import logging
-from flask import Blueprint, jsonify, render_template, send_from_directory
+from flask import Blueprint, Response, current_app, jsonify, render_template, request
 import os
 
 logger = logging.getLogger(__name__)
@@ -11,24 +12,55 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 web_bp = Blueprint('web', __name__)
 
+_TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Health probe body, serialized once (same bytes jsonify produced)
+_HEALTH_BODY = b'{"service":"parking-detection","status":"healthy"}\n'
+
+# Static HTML pages read once per process: {filename: (body, etag)}
+_TEMPLATE_CACHE = {}
+
+
+def _template_response(filename: str) -> Response:
+    """
+    Serve a static HTML page from templates/ out of memory
+
+    Args:
+        filename: File name inside the templates directory
+
+    Returns:
+        HTML response with an ETag (304 when the client's copy is current)
+    """
+    cached = _TEMPLATE_CACHE.get(filename)
+    if cached is None or current_app.debug:
+        # Re-read in debug mode so template edits show up without a restart
+        with open(os.path.join(_TEMPLATES_DIR, filename), 'rb') as f:
+            body = f.read()
+        cached = (body, hashlib.sha256(body).hexdigest()[:32])
+        _TEMPLATE_CACHE[filename] = cached
+
+    body, etag = cached
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response.make_conditional(request)
+
 
 @web_bp.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'parking-detection'
-    })
+    # A fresh Response per probe: after_request hooks (CORS, compression)
+    # mutate responses, so a shared instance would accumulate their changes
+    return Response(_HEALTH_BODY, mimetype='application/json')
 
 
 @web_bp.route('/testing')
 def testing():
     """Serve the API testing interface"""
     try:
-        # Get the templates directory path
-        templates_dir = os.path.join(os.path.dirname(
-            os.path.dirname(__file__)), 'templates')
-        return send_from_directory(templates_dir, 'testing.html')
+        return _template_response('testing.html')
     except Exception as e:
         logger.error(f"Error serving testing page: {e}")
         return jsonify({'error': 'Testing page not found'}), 404
@@ -38,9 +70,7 @@ def testing():
 def index():
     """Serve the landing page"""
     try:
-        templates_dir = os.path.join(os.path.dirname(
-            os.path.dirname(__file__)), 'templates')
-        return send_from_directory(templates_dir, 'landing.html')
+        return _template_response('landing.html')
     except Exception as e:
         logger.error(f"Error serving landing page: {e}")
         return jsonify({'error': 'Landing page not found'}), 404
@@ -50,9 +80,7 @@ def index():
 def dashboard():
     """Serve the organization dashboard"""
     try:
-        templates_dir = os.path.join(os.path.dirname(
-            os.path.dirname(__file__)), 'templates')
-        return send_from_directory(templates_dir, 'dashboard.html')
+        return _template_response('dashboard.html')
     except Exception as e:
         logger.error(f"Error serving dashboard page: {e}")
         return jsonify({'error': 'Dashboard page not found'}), 404
@@ -62,9 +90,7 @@ def dashboard():
 def old_dashboard():
     """Serve the old interactive web interface"""
     try:
-        templates_dir = os.path.join(os.path.dirname(
-            os.path.dirname(__file__)), 'templates')
-        return send_from_directory(templates_dir, 'index.html')
+        return _template_response('index.html')
     except Exception as e:
         logger.error(f"Error serving old dashboard page: {e}")
         return jsonify({'error': 'Old dashboard page not found'}), 404
@@ -44,6 +44,22 @@ CORS(app)
 # Configure Flask
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
 
+# Use orjson for jsonify and request.get_json when it is installed
+from utils.json_utils import ORJSON_AVAILABLE, OrJSONProvider
+if ORJSON_AVAILABLE:
+    app.json = OrJSONProvider(app)
+
+# Compress JSON/HTML responses (svg_code and slots_details compress well)
+try:
+    from flask_compress import Compress
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html', 'text/css', 'application/javascript']
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    app.config['COMPRESS_LEVEL'] = 4
+    Compress(app)
+except ImportError:
+    logger.warning("⚠️  Flask-Compress not installed. Response compression disabled.")
+
 # Initialize database
 from config.database import db
 db.connect()  # Connect to MongoDB on startup
@@ -52,6 +68,20 @@ db.connect()  # Connect to MongoDB on startup
 from auth.jwt_handler import jwt_handler
 jwt_handler.init_app(app)
 
+# Initialize rate limiting
+from middlewares.rate_limit import rate_limiter
+rate_limiter.init_app(app)
+
+# Load detector weights now (before gunicorn forks with preload_app) so the
+# first detection request in each worker does not pay for it
+if os.getenv('PRELOAD_DETECTION_MODEL', 'true').lower() == 'true':
+    from parking_detection import ParkingDetectionSystem
+    try:
+        ParkingDetectionSystem.preload_model()
+        logger.info("✅ Detection model preloaded")
+    except Exception as e:
+        logger.warning(f"⚠️  Detection model preload failed, will load on first request: {e}")
+
 # Register blueprints
 logger.info("Registering API blueprints...")
 
@@ -79,6 +109,15 @@ def not_found(error):
     }, 404
 
 
+@app.errorhandler(429)
+def rate_limited(error):
+    """Handle rate limit errors"""
+    return {
+        'error': 'Too many requests',
+        'message': str(getattr(error, 'description', 'Rate limit exceeded'))
+    }, 429
+
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
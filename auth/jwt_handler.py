@@ -4,7 +4,7 @@ JWT Token Handler for authentication
 
 import os
 from datetime import timedelta
-from flask import Flask
+from flask import Flask, g, has_request_context, request
 
 try:
     from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, get_jwt
@@ -39,6 +39,12 @@ class JWTHandler:
 
         self.jwt_manager = JWTManager(app)
 
+        # Resolve the HMAC key once instead of letting flask_jwt_extended read
+        # it from app.config and re-encode it on every token encode/decode
+        signing_key = app.config['JWT_SECRET_KEY'].encode('utf-8')
+        self.jwt_manager.encode_key_loader(lambda identity: signing_key)
+        self.jwt_manager.decode_key_loader(lambda jwt_header, jwt_data: signing_key)
+
     @staticmethod
     def create_token(user_id: str, additional_claims: dict = None) -> str:
         """
@@ -64,22 +70,33 @@ class JWTHandler:
         """
         Get current user ID from JWT token or request context (for API key auth)
         """
-        # First try to get from request context (set by API key middleware)
-        from flask import request, has_request_context
+        in_request = has_request_context()
 
-        if has_request_context() and hasattr(request, 'current_user_id'):
-            return request.current_user_id
+        # First try the request context (set by the auth middleware)
+        if in_request:
+            user_id = g.get('user_id')
+            if user_id is not None:
+                return user_id
+            if hasattr(request, 'current_user_id'):
+                return request.current_user_id
 
-        # Otherwise get from JWT token
+        # Otherwise get from JWT token, once per request
         if not JWT_AVAILABLE:
             return None
-        return get_jwt_identity()
+        user_id = get_jwt_identity()
+        if in_request:
+            g.user_id = user_id
+        return user_id
 
     @staticmethod
     def get_jwt_claims() -> dict:
         """Get JWT claims/payload"""
         if not JWT_AVAILABLE:
             return {}
+
+        # Claims may come from the middleware's token cache without a fresh decode
+        if has_request_context() and 'jwt_claims' in g:
+            return g.jwt_claims
         return get_jwt()
 
     @staticmethod
@@ -2,44 +2,258 @@
 Password utilities for hashing and verification
 """
 
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+    print("⚠️  Warning: argon2-cffi not installed. Falling back to bcrypt.")
+
 try:
     import bcrypt
     BCRYPT_AVAILABLE = True
 except ImportError:
     BCRYPT_AVAILABLE = False
-    print("⚠️  Warning: bcrypt not installed. Password hashing disabled.")
+    if not ARGON2_AVAILABLE:
+        print("⚠️  Warning: bcrypt not installed. Password hashing disabled.")
+
+
+# Argon2id parameters. Raising them makes check_needs_rehash() flag existing
+# hashes, which are then upgraded on the user's next successful login.
+_ARGON2 = PasswordHasher(
+    time_cost=int(os.getenv('ARGON2_TIME_COST', 2)),
+    memory_cost=int(os.getenv('ARGON2_MEMORY_COST', 65536)),  # KiB
+    parallelism=int(os.getenv('ARGON2_PARALLELISM', 2))
+) if ARGON2_AVAILABLE else None
+
+# Bounded pool for password hashing. The KDF releases the GIL, so hashing scales
+# with cores; the semaphore sheds load instead of queueing without limit.
+_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+_HASH_POOL = ThreadPoolExecutor(max_workers=_HASH_WORKERS, thread_name_prefix='pwhash')
+_HASH_SLOTS = threading.BoundedSemaphore(_HASH_WORKERS * 2)
+
+
+# bcrypt work factor for the fallback path. BCRYPT_COST pins it; otherwise the
+# largest cost whose hash fits in BCRYPT_TARGET_MS on this CPU is picked once.
+_BCRYPT_COST = int(os.environ['BCRYPT_COST']) if os.getenv('BCRYPT_COST') else None
+_BCRYPT_TARGET_MS = float(os.getenv('BCRYPT_TARGET_MS', 100))
+_BCRYPT_COST_LOCK = threading.Lock()
+
+
+def _calibrate_cost(min_cost: int = 10, max_cost: int = 14) -> int:
+    """
+    Pick the largest bcrypt cost that hashes within BCRYPT_TARGET_MS
+
+    Args:
+        min_cost: Lowest cost considered (always accepted)
+        max_cost: Highest cost considered
+
+    Returns:
+        bcrypt cost (log2 rounds)
+    """
+    chosen = min_cost
+    for cost in range(min_cost, max_cost + 1):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'x', bcrypt.gensalt(rounds=cost))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > _BCRYPT_TARGET_MS:
+            break
+        chosen = cost
+    print(f"🔐 bcrypt cost calibrated to {chosen} (target {_BCRYPT_TARGET_MS:.0f}ms)")
+    return chosen
+
+
+def _bcrypt_cost() -> int:
+    """Return the bcrypt cost, calibrating on first use"""
+    global _BCRYPT_COST
+    if _BCRYPT_COST is None:
+        with _BCRYPT_COST_LOCK:
+            if _BCRYPT_COST is None:
+                _BCRYPT_COST = _calibrate_cost()
+    return _BCRYPT_COST
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already in flight"""
 
 
 def hash_password(password: str) -> str:
     """
-    Hash password using bcrypt
-    
+    Hash password using Argon2id (bcrypt when argon2-cffi is unavailable)
+
     Args:
         password: Plain text password
-    
+
     Returns:
         Hashed password string
     """
+    if ARGON2_AVAILABLE:
+        return _ARGON2.hash(password)
+
     if not BCRYPT_AVAILABLE:
-        # Fallback for when bcrypt is not available (NOT SECURE - dev only)
+        # Fallback for when no KDF is available (NOT SECURE - dev only)
         return password
-    
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+    return bcrypt.hashpw(password.encode('utf-8'),
+                         bcrypt.gensalt(rounds=_bcrypt_cost())).decode('ascii')
 
 
 def verify_password(password: str, hashed: str) -> bool:
     """
     Verify password against hash
-    
+
+    Args:
+        password: Plain text password to verify
+        hashed: Hashed password from database (Argon2id or legacy bcrypt)
+
+    Returns:
+        True if password matches, False otherwise
+    """
+    if ARGON2_AVAILABLE and hashed.startswith('$argon2'):
+        try:
+            return _ARGON2.verify(hashed, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    if BCRYPT_AVAILABLE and hashed.startswith('$2'):
+        # Hashes are pure ASCII, which encodes without UTF-8 validation
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('ascii'))
+
+    if not ARGON2_AVAILABLE and not BCRYPT_AVAILABLE:
+        # Fallback for when no KDF is available (NOT SECURE - dev only)
+        return hmac.compare_digest(password.encode('utf-8'), hashed.encode('utf-8'))
+
+    return False
+
+
+def verify_password_b(password: bytes, hashed: bytes) -> bool:
+    """
+    Verify password against hash without any str/bytes conversion
+
+    Args:
+        password: UTF-8 encoded password to verify
+        hashed: Hashed password as stored bytes (e.g. a bson.Binary field)
+
+    Returns:
+        True if password matches, False otherwise
+    """
+    if ARGON2_AVAILABLE and hashed.startswith(b'$argon2'):
+        try:
+            return _ARGON2.verify(hashed, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    if BCRYPT_AVAILABLE and hashed.startswith(b'$2'):
+        return bcrypt.checkpw(password, hashed)
+
+    if not ARGON2_AVAILABLE and not BCRYPT_AVAILABLE:
+        # Fallback for when no KDF is available (NOT SECURE - dev only)
+        return hmac.compare_digest(password, hashed)
+
+    return False
+
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Check whether a stored hash should be upgraded to the current Argon2id parameters
+
+    Args:
+        hashed: Hashed password from database
+
+    Returns:
+        True for legacy bcrypt hashes or Argon2 hashes with outdated parameters
+    """
+    if not ARGON2_AVAILABLE:
+        return False
+
+    if not hashed.startswith('$argon2'):
+        return hashed.startswith('$2')
+
+    return _ARGON2.check_needs_rehash(hashed)
+
+
+def _submit_bounded(fn, *args) -> Future:
+    """Submit work to the hashing pool, holding a slot until it finishes"""
+    if not _HASH_SLOTS.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing capacity exceeded")
+
+    try:
+        future = _HASH_POOL.submit(fn, *args)
+    except BaseException:
+        _HASH_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _HASH_SLOTS.release())
+    return future
+
+
+def hash_password_async(password: str) -> Future:
+    """
+    Start hashing a password on the shared hashing pool
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        Future resolving to the hashed password string
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
+    """
+    return _submit_bounded(hash_password, password)
+
+
+def verify_password_async(password: str, hashed: str) -> Future:
+    """
+    Start verifying a password on the shared hashing pool
+
     Args:
         password: Plain text password to verify
         hashed: Hashed password from database
-    
+
+    Returns:
+        Future resolving to True if password matches, False otherwise
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
+    """
+    return _submit_bounded(verify_password, password, hashed)
+
+
+def hash_password_bounded(password: str) -> str:
+    """
+    Hash password on the shared hashing pool
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        Hashed password string
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
+    """
+    return hash_password_async(password).result()
+
+
+def verify_password_bounded(password: str, hashed: str) -> bool:
+    """
+    Verify password on the shared hashing pool
+
+    Args:
+        password: Plain text password to verify
+        hashed: Hashed password from database
+
     Returns:
         True if password matches, False otherwise
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
     """
-    if not BCRYPT_AVAILABLE:
-        # Fallback for when bcrypt is not available (NOT SECURE - dev only)
-        return password == hashed
-    
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return verify_password_async(password, hashed).result()
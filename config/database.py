@@ -2,9 +2,11 @@
 MongoDB Database Configuration and Connection Management
 """
 
+import functools
 import os
 import logging
-from pymongo import MongoClient, ASCENDING, DESCENDING
+import threading
+from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING, HASHED
 from pymongo.errors import ConnectionFailure
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,7 @@ class Database:
     _instance = None
     _client = None
     _db = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         """Singleton pattern to ensure only one database connection"""
@@ -33,18 +36,30 @@ class Database:
         if self._client is not None:
             return  # Already connected
 
+        # Threads racing on the first request must not each open a client and pool
+        with self._lock:
+            if self._client is None:
+                self._connect()
+
+    def _connect(self):
+        client = None
         try:
             mongodb_uri = os.getenv(
                 'MONGODB_URI', 'mongodb://localhost:27017/')
             db_name = os.getenv('MONGODB_DB_NAME', 'parking_detection')
 
-            self._client = MongoClient(
-                mongodb_uri, serverSelectionTimeoutMS=5000)
+            # Compressors whose library is not installed are skipped by pymongo
+            client = MongoClient(
+                mongodb_uri, serverSelectionTimeoutMS=5000,
+                maxPoolSize=int(os.getenv('MONGO_POOL_MAX', 50)),
+                minPoolSize=int(os.getenv('MONGO_POOL_MIN', 5)),
+                compressors=os.getenv('MONGO_COMPRESSORS', 'zstd,snappy'),
+                retryWrites=True)
 
             # Test connection
-            self._client.admin.command('ping')
+            client.admin.command('ping')
 
-            self._db = self._client[db_name]
+            self._db = client[db_name]
 
             # Create indexes
             self._create_indexes()
@@ -58,32 +73,49 @@ class Database:
         except Exception as e:
             logger.error(f"❌ Database initialization error: {e}")
             self._db = None
+        finally:
+            # Published last so the unlocked check in connect() never sees a
+            # client whose database handle is not set yet
+            self._client = client
 
     def _create_indexes(self):
         """Create database indexes for better performance"""
         if self._db is None:
             return
 
-        try:
-            # Users collection indexes
-            users = self._db['users']
-            users.create_index([('username', ASCENDING)], unique=True)
-            users.create_index([('user_id', ASCENDING)], unique=True)
-
-            # Parking data collection indexes
-            parking_data = self._db['parking_data']
-            parking_data.create_index([('user_id', ASCENDING)])
-            parking_data.create_index([('camera_id', ASCENDING)])
-            parking_data.create_index([('timestamp', DESCENDING)])
-            parking_data.create_index(
-                [('user_id', ASCENDING), ('camera_id', ASCENDING)])
-            parking_data.create_index(
-                [('user_id', ASCENDING), ('timestamp', DESCENDING)])
-
-            logger.info("✅ Database indexes created")
-
-        except Exception as e:
-            logger.warning(f"⚠️  Index creation warning: {e}")
+        # One createIndexes command per collection instead of one per index
+        parking_models = [
+            IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)]),
+            # Latest records for one camera of a user, without an in-memory sort.
+            # Its (user_id, camera_id) prefix replaces the old two-field index.
+            # Default name, so it matches the index setup_indexes.py builds.
+            IndexModel([('user_id', ASCENDING), ('camera_id', ASCENDING), ('timestamp', DESCENDING)]),
+            # Latest frame per camera across users
+            IndexModel([('camera_id', ASCENDING), ('timestamp', DESCENDING)])
+        ]
+        if os.getenv('MONGO_HASHED_USER_INDEX', 'false').lower() == 'true':
+            # Prepares a hashed user_id shard key; costs a write per insert
+            parking_models.append(IndexModel([('user_id', HASHED)], name='uid_hashed'))
+
+        indexes = {
+            'users': [
+                IndexModel([('username', ASCENDING)], unique=True),
+                IndexModel([('user_id', ASCENDING)], unique=True)
+            ],
+            'parking_data': parking_models,
+            'camera_layouts': [
+                IndexModel([('layout_id', ASCENDING)], unique=True)
+            ]
+        }
+
+        # Each collection on its own, so one conflict can't skip the others
+        for name, models in indexes.items():
+            try:
+                self._db[name].create_indexes(models)
+            except Exception as e:
+                logger.warning(f"⚠️  Index creation warning ({name}): {e}")
+
+        logger.info("✅ Database indexes created")
 
     @property
     def db(self):
@@ -92,32 +124,50 @@ class Database:
             self.connect()
         return self._db
 
-    @property
-    def users(self):
-        """Get users collection (lazy connection)"""
+    @functools.cache
+    def _collection(self, name: str):
+        """
+        Get a collection handle, built once per process (lazy connection)
+
+        pymongo builds a new Collection object on every db[name] lookup; the
+        cache makes repeat accesses a single dict hit. Failures raise and are
+        therefore not cached.
+        """
         if self._db is None:
             self.connect()
         if self._db is None:
             raise Exception("Database not connected")
-        return self._db['users']
+        return self._db[name]
+
+    @property
+    def users(self):
+        """Get users collection (lazy connection)"""
+        return self._collection('users')
 
     @property
     def parking_data(self):
         """Get parking_data collection (lazy connection)"""
-        if self._db is None:
-            self.connect()
-        if self._db is None:
-            raise Exception("Database not connected")
-        return self._db['parking_data']
+        return self._collection('parking_data')
 
     @property
     def api_credentials(self):
         """Get api_credentials collection (lazy connection)"""
-        if self._db is None:
-            self.connect()
-        if self._db is None:
-            raise Exception("Database not connected")
-        return self._db['api_credentials']
+        return self._collection('api_credentials')
+
+    @property
+    def camera_layouts(self):
+        """Get camera_layouts collection (lazy connection)"""
+        return self._collection('camera_layouts')
+
+    def reset_after_fork(self):
+        """Drop the client inherited from a parent process and connect again"""
+        if self._client is None:
+            return
+        # The parent still uses the inherited sockets, so they are not closed here
+        self._client = None
+        self._db = None
+        Database._collection.cache_clear()
+        self.connect()
 
     def is_connected(self):
         """Check if database is connected"""
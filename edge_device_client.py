@@ -13,13 +13,41 @@ Setup:
 4. Generate an API key
 5. Copy the API key and paste below
 6. Run this script: python edge_device_client.py
+
+Requirements:
+    pip install requests "httpx[http2]" requests-toolbelt orjson numpy
+    pip install uvloop  # optional, faster event loop (Linux/macOS)
 """
 
+import asyncio
+import base64
+import httpx
+import numpy as np
+import os
 import requests
 import json
 import time
 from datetime import datetime
-from typing import List, Tuple
+from typing import List
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import uvloop
+    uvloop.install()  # libuv event loop for asyncio.run() below
+except ImportError:
+    pass
+
+try:
+    from requests_toolbelt import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+    print("⚠️  Warning: requests-toolbelt not installed. Raw images are buffered in memory before upload.")
 
 # ============================================================================
 # CONFIGURATION - Update these values
@@ -40,6 +68,12 @@ PARKING_COORDINATES = [
 ]
 
 UPDATE_INTERVAL = 30  # Seconds between updates
+BATCH_WINDOW = 1.0  # Seconds queued updates wait before one /parking/batchUpdate
+
+# CPU cores to pin this client to for a steady upload cadence, e.g. {5} for a
+# big core on a Jetson (Linux only). None leaves scheduling to the OS, which
+# is better when YOLO inference runs in this process too.
+CPU_AFFINITY = None
 
 # ============================================================================
 # API Client Class
@@ -53,15 +87,174 @@ class ParkingAPIClient:
         self.api_url = api_url.rstrip('/')
         self.api_key = api_key
         self.camera_id = camera_id
+        self.layout_id = None
+        self._occupancy_prefix = None
+        self._buffer = []
+        self._flush_task = None
+        # Keep-alive session for the blocking multipart and health calls; it
+        # sets no Content-Type so multipart requests get their own boundary
         self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
+        self.session.headers['Authorization'] = f'Bearer {api_key}'
+        self._update_url = f"{self.api_url}/parking/update"
+        # One multiplexed HTTP/2 connection is shared by every update; every
+        # POST body it sends is JSON, so the headers are set once here
+        self._client = httpx.AsyncClient(
+            http2=True,
+            headers={
+                'Authorization': f'Bearer {api_key}',
+                'Content-Type': 'application/json'
+            },
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
+
+    async def aclose(self):
+        """Send any queued updates and close the pooled HTTP connection"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        await self._client.aclose()
+        self.session.close()
+
+    def queue_occupancy(self, occupied_mask: np.ndarray,
+                        camera_id: str = None, layout_id: str = None):
+        """
+        Queue a compact occupancy update to be sent with others in one request
+
+        A gateway serving several cameras can share one client and queue each
+        camera's update here; everything queued within BATCH_WINDOW seconds
+        is stored by the server with a single insert_many.
+
+        Args:
+            occupied_mask: Boolean array, one entry per registered slot
+            camera_id: Camera the update belongs to (defaults to this client's)
+            layout_id: Registered layout of that camera (defaults to this client's)
+        """
+        self._buffer.append({
+            'camera_id': camera_id or self.camera_id,
+            'layout_id': layout_id or self.layout_id,
+            'occupied_bitmap': base64.b64encode(np.packbits(occupied_mask).tobytes()).decode('ascii'),
+            'timestamp_ms': time.time_ns() // 1_000_000
         })
 
-    def send_update(self, coordinates: List[List[int]],
-                    occupied_count: int, total_count: int,
-                    slots_details: List[dict] = None) -> dict:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(BATCH_WINDOW)
+        await self.flush()
+
+    async def flush(self) -> dict:
+        """
+        Send all queued updates in one /parking/batchUpdate request
+
+        Returns:
+            API response as dictionary (empty when nothing was queued)
+        """
+        if not self._buffer:
+            return {}
+
+        batch, self._buffer = self._buffer, []
+        try:
+            result = await self._post_json('/parking/batchUpdate', {'updates': batch})
+            print(f"✅ Batch of {result.get('count', len(batch))} updates sent "
+                  f"at {datetime.now():%H:%M:%S}")
+            return result
+
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"❌ Error sending batch of {len(batch)} updates: {e}")
+            return {'error': str(e)}
+
+    @staticmethod
+    def _dumps(payload: dict) -> bytes:
+        """Serialize a payload to compact JSON bytes"""
+        # orjson also accepts NumPy arrays, so OpenCV coordinates need no .tolist()
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    async def _post_body(self, url: str, body: bytes) -> dict:
+        """
+        POST an encoded JSON body and return the decoded response
+
+        Raises:
+            httpx.HTTPError: On transport errors and non-2xx responses
+            ValueError: If the body isn't JSON (orjson.JSONDecodeError and
+                json.JSONDecodeError both subclass it), e.g. a proxy error page
+        """
+        response = await self._client.post(url, content=body, timeout=10)
+        response.raise_for_status()
+        if ORJSON_AVAILABLE:
+            return orjson.loads(response.content)
+        return response.json()
+
+    async def _post_json(self, path: str, payload: dict) -> dict:
+        """POST a JSON payload and return the decoded response"""
+        return await self._post_body(f"{self.api_url}{path}", self._dumps(payload))
+
+    async def register_camera(self, coordinates: List[List[int]]) -> bool:
+        """
+        Register slot coordinates once so updates only carry an occupancy bitmap
+
+        Args:
+            coordinates: List of parking slot coordinates [[x1,y1,x2,y2], ...]
+
+        Returns:
+            True if the layout was registered
+        """
+        try:
+            result = await self._post_json('/parking/registerCamera', {
+                'camera_id': self.camera_id,
+                'coordinates': coordinates
+            })
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"⚠️  Camera registration failed, sending full updates: {e}")
+            return False
+
+        self.layout_id = result['layout_id']
+        # The static part of every occupancy update, as an open JSON object
+        self._occupancy_prefix = self._dumps({
+            'camera_id': self.camera_id,
+            'layout_id': self.layout_id
+        })[:-1]
+        print(f"✅ Camera layout registered: {self.layout_id} ({result['total_slots']} slots)")
+        return True
+
+    async def send_occupancy(self, occupied_mask: np.ndarray) -> dict:
+        """
+        Send an occupancy update for the registered layout
+
+        Args:
+            occupied_mask: Boolean array, one entry per registered slot
+
+        Returns:
+            API response as dictionary
+        """
+        # One bit per slot; the server rebuilds slot details from the layout.
+        # Base64 needs no JSON escaping, so only the dynamic fields are
+        # appended to the pre-encoded prefix.
+        body = b''.join((
+            self._occupancy_prefix,
+            b',"occupied_bitmap":"', base64.b64encode(np.packbits(occupied_mask).tobytes()),
+            b'","timestamp_ms":', str(time.time_ns() // 1_000_000).encode('ascii'),
+            b'}'
+        ))
+
+        occupied_count = int(np.count_nonzero(occupied_mask))
+        total_count = len(occupied_mask)
+
+        try:
+            result = await self._post_body(self._update_url, body)
+            print(f"✅ Data sent successfully at {datetime.now():%H:%M:%S}\n"
+                  f"   Occupancy: {occupied_count}/{total_count}")
+            return result
+
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"❌ Error sending data: {e}")
+            return {'error': str(e)}
+
+    async def send_update(self, coordinates: List[List[int]],
+                          occupied_count: int, total_count: int,
+                          slots_details: List[dict] = None) -> dict:
         """
         Send parking occupancy update to cloud API
 
@@ -74,8 +267,6 @@ class ParkingAPIClient:
         Returns:
             API response as dictionary
         """
-        url = f"{self.api_url}/parking/update"
-
         empty_count = total_count - occupied_count
         occupancy_rate = (occupied_count / total_count *
                           100) if total_count > 0 else 0
@@ -87,25 +278,20 @@ class ParkingAPIClient:
             'occupied_slots': occupied_count,
             'empty_slots': empty_count,
             'occupancy_rate': round(occupancy_rate, 2),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ms': time.time_ns() // 1_000_000  # Epoch millis, no formatting
         }
 
         if slots_details:
             payload['slots_details'] = slots_details
 
         try:
-            response = self.session.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-
-            result = response.json()
-            print(
-                f"✅ Data sent successfully at {datetime.now().strftime('%H:%M:%S')}")
-            print(
-                f"   Occupancy: {occupied_count}/{total_count} ({occupancy_rate:.1f}%)")
+            result = await self._post_body(self._update_url, self._dumps(payload))
+            print(f"✅ Data sent successfully at {datetime.now():%H:%M:%S}\n"
+                  f"   Occupancy: {occupied_count}/{total_count} ({occupancy_rate:.1f}%)")
 
             return result
 
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             print(f"❌ Error sending data: {e}")
             return {'error': str(e)}
 
@@ -124,15 +310,24 @@ class ParkingAPIClient:
 
         try:
             with open(image_path, 'rb') as f:
-                files = {'image': f}
-                data = {
-                    'coordinates': json.dumps(coordinates),
-                    'camera_id': self.camera_id
-                }
-                headers = {'Authorization': f'Bearer {self.api_key}'}
-
-                response = requests.post(url, files=files, data=data,
-                                         headers=headers, timeout=30)
+                if TOOLBELT_AVAILABLE:
+                    # Streams the file from disk in small chunks instead of
+                    # building the whole multipart body in memory
+                    encoder = MultipartEncoder(fields={
+                        'image': (os.path.basename(image_path), f, 'image/jpeg'),
+                        'coordinates': json.dumps(coordinates),
+                        'camera_id': self.camera_id
+                    })
+                    response = self.session.post(
+                        url, data=encoder,
+                        headers={'Content-Type': encoder.content_type}, timeout=30)
+                else:
+                    files = {'image': f}
+                    data = {
+                        'coordinates': json.dumps(coordinates),
+                        'camera_id': self.camera_id
+                    }
+                    response = self.session.post(url, files=files, data=data, timeout=30)
                 response.raise_for_status()
 
                 result = response.json()
@@ -151,7 +346,7 @@ class ParkingAPIClient:
         url = f"{self.api_url}/health"
 
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             print("✅ Server connection successful")
             return True
@@ -164,7 +359,11 @@ class ParkingAPIClient:
 # Mock Detection (Replace with real YOLO detection)
 # ============================================================================
 
-def detect_parking_occupancy(coordinates: List[List[int]]) -> Tuple[int, List[dict]]:
+# Seeded once; reused by every mock detection
+_MOCK_RNG = np.random.default_rng()
+
+
+def detect_parking_occupancy(coordinates: List[List[int]]) -> np.ndarray:
     """
     Mock detection function - Replace with your actual YOLO detection
 
@@ -172,36 +371,38 @@ def detect_parking_occupancy(coordinates: List[List[int]]) -> Tuple[int, List[di
     1. Capture frame from camera
     2. Run YOLOv8 vehicle detection
     3. Check which parking slots contain vehicles
-    4. Return occupied count and slot details
+    4. Return the occupancy of each slot
 
     Args:
         coordinates: Parking slot coordinates
 
     Returns:
-        (occupied_count, slots_details)
+        Boolean occupancy mask, one entry per slot
     """
-    import random
-
     # Simulate detection - replace with actual YOLO
-    occupied_count = random.randint(0, len(coordinates))
-
-    slots_details = []
-    occupied_indices = random.sample(range(len(coordinates)), occupied_count)
+    return _MOCK_RNG.random(len(coordinates)) < 0.5
 
-    for i, coord in enumerate(coordinates):
-        slots_details.append({
-            'slot_id': i,
-            'coordinates': coord,
-            'is_occupied': i in occupied_indices
-        })
 
-    return occupied_count, slots_details
+def build_slots_details(coordinates: List[List[int]],
+                        occupied_mask: np.ndarray) -> List[dict]:
+    """Expand an occupancy mask into per-slot details for a full update"""
+    return [
+        {'slot_id': i, 'coordinates': coord, 'is_occupied': occupied}
+        for i, (coord, occupied) in enumerate(zip(coordinates, occupied_mask.tolist()))
+    ]
 
 
 # ============================================================================
 # Main Application
 # ============================================================================
 
+def pin_cpu():
+    """Apply CPU_AFFINITY where the platform supports it"""
+    if CPU_AFFINITY and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, CPU_AFFINITY)
+        print(f"📌 Pinned to CPU(s): {sorted(CPU_AFFINITY)}")
+
+
 def main():
     """Main application loop"""
 
@@ -235,40 +436,76 @@ def main():
     print("\n✅ Ready to send parking data!")
     print("Press Ctrl+C to stop\n")
 
-    # Main loop
+    pin_cpu()
+
+    stats = {'iterations': 0}
+    try:
+        asyncio.run(monitor_loop(client, stats))
+    except KeyboardInterrupt:
+        print("\n\n👋 Shutting down gracefully...")
+        print("Total iterations:", stats['iterations'])
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        raise
+
+
+async def send_and_report(client: ParkingAPIClient, occupied_mask: np.ndarray):
+    """Send one update and print the stored document ID"""
+    if client.layout_id:
+        # Registered layout: only the packed occupancy bits go over the wire
+        result = await client.send_occupancy(occupied_mask)
+    else:
+        result = await client.send_update(
+            coordinates=PARKING_COORDINATES,
+            occupied_count=int(np.count_nonzero(occupied_mask)),
+            total_count=len(PARKING_COORDINATES),
+            slots_details=build_slots_details(PARKING_COORDINATES, occupied_mask)
+        )
+
+    document_id = result.get('document_id')
+    if document_id:
+        print(f"   Document ID: {document_id}")
+
+
+async def monitor_loop(client: ParkingAPIClient, stats: dict):
+    """
+    Detect and send updates forever
+
+    Each update is sent in the background while the next detection runs, so
+    the network round trip overlaps with inference instead of adding to it.
+    """
+    pending = None
+
+    # Coordinates are sent once here instead of with every update
+    await client.register_camera(PARKING_COORDINATES)
+
     try:
-        iteration = 0
         while True:
-            iteration += 1
+            stats['iterations'] += 1
             print(
-                f"\n[Iteration {iteration}] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                f"\n[Iteration {stats['iterations']}] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-            # Detect parking occupancy
+            # Detect parking occupancy (off the event loop)
             # TODO: Replace with your actual YOLO detection
-            occupied_count, slots_details = detect_parking_occupancy(
-                PARKING_COORDINATES)
+            occupied_mask = await asyncio.to_thread(
+                detect_parking_occupancy, PARKING_COORDINATES)
 
-            # Send to cloud API
-            result = client.send_update(
-                coordinates=PARKING_COORDINATES,
-                occupied_count=occupied_count,
-                total_count=len(PARKING_COORDINATES),
-                slots_details=slots_details
-            )
+            # Keep at most one update in flight
+            if pending is not None:
+                await pending
 
-            if 'document_id' in result:
-                print(f"   Document ID: {result['document_id']}")
+            # Send to cloud API
+            pending = asyncio.create_task(
+                send_and_report(client, occupied_mask))
 
             # Wait before next update
             print(f"   Waiting {UPDATE_INTERVAL}s...")
-            time.sleep(UPDATE_INTERVAL)
+            await asyncio.sleep(UPDATE_INTERVAL)
 
-    except KeyboardInterrupt:
-        print("\n\n👋 Shutting down gracefully...")
-        print("Total iterations:", iteration)
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        raise
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+        await client.aclose()
 
 
 # ============================================================================
@@ -317,29 +554,43 @@ def production_example_with_camera():
 
     print("Camera opened. Processing frames...")
 
-    try:
-        while True:
-            # Capture frame
-            ret, frame = cap.read()
-            if not ret:
-                break
+    async def capture_loop():
+        pending = None
+        try:
+            while True:
+                # Capture frame
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                # Run YOLO detection while the previous update is still sending
+                results = await asyncio.to_thread(model, frame)
+
+                # Process detections to check parking slot occupancy
+                # (Your parking occupancy logic here)
+                occupied_count = 0  # Calculate from YOLO results
 
-            # Run YOLO detection
-            results = model(frame)
+                if pending is not None:
+                    await pending
 
-            # Process detections to check parking slot occupancy
-            # (Your parking occupancy logic here)
-            occupied_count = 0  # Calculate from YOLO results
+                # Send to cloud
+                pending = asyncio.create_task(client.send_update(
+                    coordinates=PARKING_COORDINATES,
+                    occupied_count=occupied_count,
+                    total_count=len(PARKING_COORDINATES)
+                ))
 
-            # Send to cloud
-            client.send_update(
-                coordinates=PARKING_COORDINATES,
-                occupied_count=occupied_count,
-                total_count=len(PARKING_COORDINATES)
-            )
+                await asyncio.sleep(UPDATE_INTERVAL)
 
-            time.sleep(UPDATE_INTERVAL)
+            if pending is not None:
+                await pending
+        finally:
+            await client.aclose()
 
+    pin_cpu()
+
+    try:
+        asyncio.run(capture_loop())
     finally:
         cap.release()
         print("Camera released")
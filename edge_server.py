@@ -5,16 +5,25 @@ Captures frames from multiple cameras and sends to cloud server via /updateRaw A
 with authentication and node-specific coordinates
 """
 
+import os
+
+# Must be set before cv2 loads its OpenMP runtime; see cv2.setNumThreads below
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
 import cv2
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import logging
 import json
-import os
-from datetime import datetime
+import gzip
 from pathlib import Path
+import queue
+import signal
 import sys
 import threading
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 # Configure logging
@@ -28,16 +37,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Each camera already gets its own threads; OpenCV's internal parallel regions
+# on top of that oversubscribe the Pi's 4 cores
+cv2.setNumThreads(1)
+
+
+def pin_current_thread(cpus: Optional[List[int]], name: str):
+    """
+    Restrict the calling thread to the given cores where the platform supports it
+
+    Args:
+        cpus: Core indices, or None/empty to leave scheduling alone
+        name: Label for the log message
+    """
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        # pid 0 is the calling thread on Linux
+        os.sched_setaffinity(0, set(cpus))
+        logger.info(f"[{name}] 📌 Pinned to CPU(s): {sorted(set(cpus))}")
+    except OSError as e:
+        logger.warning(f"[{name}] ⚠️ Could not pin to CPU(s) {cpus}: {e}")
+
+# libjpeg-turbo encoder (NEON on the Pi, AVX2 on x86); OpenCV is the fallback
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _TURBOJPEG = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError):
+    _TURBOJPEG = None
+    TURBOJPEG_AVAILABLE = False
+    logger.warning("⚠️ PyTurboJPEG/libturbojpeg not available, encoding frames with OpenCV")
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# Largest coordinates JSON sent in the X-Coordinates header of a raw upload;
+# well below the 8190-byte header field limit of gunicorn and nginx
+MAX_COORDINATES_HEADER = 4096
+
+
+def _compact_json(obj) -> str:
+    """Serialize to compact JSON, with orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
 
 class AuthManager:
     """Manages JWT authentication for the API"""
 
-    def __init__(self, base_url: str, username: str, password: str):
+    def __init__(self, base_url: str, username: str, password: str,
+                 session: Optional[requests.Session] = None):
         self.base_url = base_url
         self.username = username
         self.password = password
+        self.session = session or requests.Session()
         self.token = None
+        # Expiry on the monotonic clock, so NTP steps on the Pi can't make a
+        # live token look expired (or an expired one look live)
         self.token_expiry = 0
+        # token_expiry minus the 5min refresh buffer, checked on every upload
+        self._valid_until = 0
 
     def login(self) -> bool:
         """Login and get JWT token"""
@@ -49,12 +120,13 @@ class AuthManager:
             }
 
             logger.info(f"Logging in as {self.username}...")
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.session.post(url, json=payload, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
                 self.token = data['access_token']
-                self.token_expiry = time.time() + data.get('expires_in', 3600)
+                self.token_expiry = time.monotonic() + data.get('expires_in', 3600)
+                self._valid_until = self.token_expiry - 300
                 logger.info(
                     f"✅ Login successful! Token expires in {data.get('expires_in', 3600)}s")
                 return True
@@ -71,14 +143,15 @@ class AuthManager:
         """Check if token is still valid (with 5min buffer)"""
         if not self.token:
             return False
-        return time.time() < (self.token_expiry - 300)
+        return time.monotonic() < self._valid_until
 
     def ensure_authenticated(self) -> bool:
         """Ensure we have a valid token"""
-        if not self.is_token_valid():
-            logger.warning("⚠️ Token expired or missing, re-authenticating...")
-            return self.login()
-        return True
+        # Inlined is_token_valid(): this runs before every upload
+        if self.token and time.monotonic() < self._valid_until:
+            return True
+        logger.warning("⚠️ Token expired or missing, re-authenticating...")
+        return self.login()
 
     def get_auth_headers(self) -> Dict[str, str]:
         """Get authorization headers"""
@@ -87,13 +160,169 @@ class AuthManager:
         return {}
 
 
+class FrameGrabber:
+    """
+    Keeps a capture drained so the newest frame is always one retrieve() away
+
+    OpenCV queues frames internally (RTSP especially), so an occasional read()
+    decodes a stale frame and can stall. This thread calls grab() at the
+    source rate, which skips decoding, and only retrieve()s (decodes) the
+    frame that is current when read() asks for one. All calls on the capture
+    happen on this thread.
+
+    Frames are decoded into a ring of reused buffers instead of a fresh
+    multi-megabyte array per read. A returned frame stays valid for the next
+    buffers - 1 reads, so the ring must outlast every frame still queued or
+    being encoded downstream.
+    """
+
+    # Consecutive failed grabs before the stream is considered lost
+    MAX_GRAB_FAILURES = 50
+
+    def __init__(self, cap, name: str, cpus: Optional[List[int]] = None,
+                 buffers: int = 3):
+        self.cap = cap
+        self.name = name
+        self.cpus = cpus
+        # Filled by the first retrieve() into each slot, reused after that
+        self._buffers = [None] * max(1, buffers)
+        self._next_buffer = 0
+        self.running = False
+        self.thread = None
+        self._wanted = threading.Event()
+        self._ready = threading.Event()
+        self._frame = None
+
+    def start(self):
+        """Start grabbing in a background thread"""
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._run, name=f"grabber-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop grabbing; the caller releases the capture afterwards"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def is_alive(self) -> bool:
+        """Whether the grabber is still receiving frames"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def read(self, timeout: float = 5.0):
+        """
+        Decode and return the newest frame
+
+        Args:
+            timeout: Seconds to wait for the next grabbed frame
+
+        Returns:
+            BGR frame, or None if no frame arrived in time
+        """
+        self._ready.clear()
+        self._wanted.set()
+        if not self._ready.wait(timeout):
+            self._wanted.clear()
+            return None
+        return self._frame
+
+    def _run(self):
+        pin_current_thread(self.cpus, self.name)
+        failures = 0
+        while self.running:
+            if not self.cap.grab():
+                failures += 1
+                if failures >= self.MAX_GRAB_FAILURES:
+                    logger.error(f"[{self.name}] Stream lost, grabber stopping")
+                    break
+                time.sleep(0.1)
+                continue
+            failures = 0
+
+            if self._wanted.is_set():
+                # retrieve() decodes in place when the buffer's shape matches
+                # and allocates a new one otherwise (first use, resolution change)
+                ret, frame = self.cap.retrieve(self._buffers[self._next_buffer])
+                if ret:
+                    self._buffers[self._next_buffer] = frame
+                    self._next_buffer = (self._next_buffer + 1) % len(self._buffers)
+                self._frame = frame if ret else None
+                self._wanted.clear()
+                self._ready.set()
+
+        self.running = False
+        # Wake a reader waiting on a stream that just died
+        self._frame = None
+        self._ready.set()
+
+
+class LocalFrameWriter:
+    """
+    Writes local frame copies on a single background thread
+
+    Keeps disk latency (an SD card on the Pi can stall for hundreds of ms)
+    out of the encode/upload path. If the card falls behind, new copies are
+    dropped rather than queued without bound.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(
+            target=self._run, name='frame-writer', daemon=True)
+        self.thread.start()
+
+    def write(self, filepath: str, data: bytes) -> bool:
+        """
+        Queue bytes to be written to filepath
+
+        Args:
+            filepath: Destination file
+            data: Encoded JPEG bytes
+
+        Returns:
+            False if the queue is full and the copy was dropped
+        """
+        try:
+            self._queue.put_nowait((filepath, data))
+            return True
+        except queue.Full:
+            logger.warning(f"⚠️ Local save queue full, dropping {filepath}")
+            return False
+
+    def stop(self):
+        """Flush queued writes and stop the thread"""
+        self._queue.put((None, None))
+        self.thread.join(timeout=10)
+
+    def _run(self):
+        while True:
+            filepath, data = self._queue.get()
+            if filepath is None:
+                return
+            try:
+                with open(filepath, 'wb') as f:
+                    f.write(data)
+                logger.debug(f"Frame saved locally: {filepath}")
+            except OSError as e:
+                logger.error(f"Error saving frame locally to {filepath}: {e}")
+
+
 class CameraWorker:
     """Worker thread for a single camera"""
 
     def __init__(self, camera_config: Dict, auth_manager: AuthManager,
-                 server_config: Dict, local_settings: Dict):
+                 server_config: Dict, local_settings: Dict,
+                 session: Optional[requests.Session] = None,
+                 executor: Optional[Executor] = None,
+                 writer: Optional[LocalFrameWriter] = None):
         self.config = camera_config
         self.auth_manager = auth_manager
+        self.session = session or auth_manager.session
+        # Shared pool for encode + upload; None runs them on this camera's thread
+        self.executor = executor
+        # Background writer for local copies; None writes inline
+        self.writer = writer
         self.server_config = server_config
         self.local_settings = local_settings
 
@@ -103,24 +332,83 @@ class CameraWorker:
         self.camera_type = camera_config['camera_type']
         self.camera_index = camera_config.get('camera_index', 0)
         self.rtsp_url = camera_config.get('rtsp_url', '')
+        # GStreamer H.264 decoder for RTSP (v4l2h264dec is the Pi 4's hardware
+        # decoder, omxh264dec on older Pis); null decodes with FFmpeg on the CPU
+        self.rtsp_decoder = camera_config.get('rtsp_decoder', 'v4l2h264dec')
         self.coordinates = camera_config['coordinates']
         self.interval = camera_config.get('interval', 60)
         self.enabled = camera_config.get('enabled', True)
+        # Cores for this camera's capture threads, e.g. [2]; unset leaves
+        # placement to the scheduler
+        cpu_affinity = camera_config.get('cpu_affinity')
+        self.cpu_affinity = [cpu_affinity] if isinstance(cpu_affinity, int) else cpu_affinity
+
+        # JPEG encoding; optimized Huffman tables trim the upload a few percent
+        # and baseline (non-progressive) JPEGs decode faster on the server
+        self.jpeg_quality = int(camera_config.get('jpeg_quality', 85))
+        self._imencode_params = [
+            int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality,
+            int(cv2.IMWRITE_JPEG_OPTIMIZE), int(bool(camera_config.get('jpeg_optimize', True))),
+            int(cv2.IMWRITE_JPEG_PROGRESSIVE), 0
+        ]
+        if TURBOJPEG_AVAILABLE and camera_config.get('jpeg_optimize'):
+            # The TurboJPEG encode API has no Huffman-optimization flag
+            logger.info(
+                f"[{camera_config['node_id']}] jpeg_optimize applies to the OpenCV encoder "
+                f"only; TurboJPEG encodes with standard Huffman tables")
+
+        # Frames wider than this are downscaled before encoding; coordinates
+        # (given in source pixels) are scaled to match
+        self.encode_max_width = camera_config.get('encode_max_width')
+        self._scaled_for = None
 
         # Server settings
         self.api_base_url = server_config['api_base_url']
         self.retry_attempts = server_config.get('retry_attempts', 3)
         self.retry_delay = server_config.get('retry_delay', 5)
+        # Send the JPEG as the raw request body instead of multipart form data
+        self.raw_upload = server_config.get('raw_upload', True)
+        self._upload_params = {'camera_id': self.camera_id, 'node_id': self.node_id}
+        self._set_upload_coordinates(self.coordinates)
+
+        # Content-Encoding for raw uploads ("zstd" or "gzip") on metered or
+        # slow uplinks; JPEG barely compresses, so a compressed body is only
+        # sent when it is clearly smaller
+        self.compress_upload = server_config.get('compress_upload')
+        self._zstd = None
+        if self.compress_upload == 'zstd':
+            if ZSTD_AVAILABLE:
+                self._zstd = zstandard.ZstdCompressor(level=3)
+            else:
+                logger.warning(
+                    f"[{self.node_id}] ⚠️ zstandard not installed, sending uploads uncompressed")
+                self.compress_upload = None
 
         # Local settings
         self.save_local_copy = local_settings.get('save_local_copy', False)
         self.local_save_path = local_settings.get(
             'local_save_path', './captured_frames')
+        self._fname_prefix = ''
+        self._fname_minute = -1
 
         self.cap = None
+        self.grabber = None
         self.running = False
         self.thread = None
 
+        # Bounded hand-off to the pool: once upload_queue_size frames are
+        # waiting, the oldest is dropped so slow uploads never hold back
+        # capture and the freshest frames go out first
+        self.upload_queue_size = max(1, camera_config.get('upload_queue_size', 2))
+        self._pending = deque(maxlen=self.upload_queue_size)
+        self._pending_busy = False
+        self._pending_lock = threading.Lock()
+        self._pending_high_water = 0
+        self.frames_dropped = 0
+
+        # Per-phase timings as EWMAs (ms), reported by EdgeServer's stats thread
+        self.stats = {'capture_ms': 0.0, 'encode_ms': 0.0, 'upload_ms': 0.0}
+
         # Create local save directory if needed
         if self.save_local_copy:
             node_path = os.path.join(self.local_save_path, self.node_id)
@@ -133,8 +421,7 @@ class CameraWorker:
 
         try:
             # Release existing connection if any
-            if self.cap is not None:
-                self.cap.release()
+            self.release_camera()
 
             if self.camera_type == 'usb':
                 logger.info(
@@ -147,7 +434,7 @@ class CameraWorker:
             else:
                 logger.info(
                     f"[{self.node_id}] Connecting to RTSP camera at {self.rtsp_url}")
-                self.cap = cv2.VideoCapture(self.rtsp_url)
+                self.cap = self.open_rtsp()
 
             # Set buffer size to reduce latency
             self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
@@ -167,60 +454,191 @@ class CameraWorker:
 
             logger.info(
                 f"[{self.node_id}] ✅ Connected - Resolution: {test_frame.shape[1]}x{test_frame.shape[0]}")
+
+            # Keep draining the stream so captures always get the latest frame
+            # Live frames: up to upload_queue_size queued, one being encoded,
+            # plus the one being retrieved
+            self.grabber = FrameGrabber(self.cap, self.node_id, cpus=self.cpu_affinity,
+                                        buffers=self.upload_queue_size + 2)
+            self.grabber.start()
             return True
 
         except Exception as e:
             logger.error(f"[{self.node_id}] Error connecting to camera: {e}")
             return False
 
-    def capture_frame(self) -> Optional[bytes]:
-        """Capture a single frame and return as JPEG bytes"""
+    def open_rtsp(self) -> cv2.VideoCapture:
+        """Open the RTSP stream, preferring hardware decode through GStreamer"""
+        if self.rtsp_decoder:
+            pipeline = (
+                f'rtspsrc location={self.rtsp_url} latency=50 ! rtph264depay ! h264parse ! '
+                f'{self.rtsp_decoder} ! videoconvert ! video/x-raw,format=BGR ! '
+                'appsink drop=1 max-buffers=1 sync=false'
+            )
+            cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+            if cap.isOpened():
+                logger.info(f"[{self.node_id}] Decoding RTSP with GStreamer {self.rtsp_decoder}")
+                return cap
+            cap.release()
+            logger.warning(
+                f"[{self.node_id}] ⚠️ GStreamer {self.rtsp_decoder} pipeline unavailable, "
+                f"falling back to FFmpeg decode")
+
+        return cv2.VideoCapture(self.rtsp_url)
+
+    def release_camera(self):
+        """Stop the grabber and release the capture device"""
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def read_frame(self):
+        """Return the newest camera frame, reconnecting if needed"""
         try:
-            if self.cap is None or not self.cap.isOpened():
+            if (self.cap is None or not self.cap.isOpened()
+                    or self.grabber is None or not self.grabber.is_alive()):
                 logger.warning(
                     f"[{self.node_id}] Camera not connected, attempting to reconnect...")
                 if not self.connect_camera():
                     return None
 
-            # Read frame
-            ret, frame = self.cap.read()
+            # Newest frame from the grabber thread
+            return self.grabber.read()
 
-            if not ret or frame is None:
-                logger.error(f"[{self.node_id}] Failed to capture frame")
-                return None
+        except Exception as e:
+            logger.error(f"[{self.node_id}] Error capturing frame: {e}")
+            return None
+
+    def capture_frame(self) -> Optional[bytes]:
+        """Capture a single frame and return as JPEG bytes"""
+        frame = self.read_frame()
+
+        if frame is None:
+            logger.error(f"[{self.node_id}] Failed to capture frame")
+            return None
+
+        return self.prepare_upload(frame)
+
+    def prepare_upload(self, frame) -> Optional[bytes]:
+        """Downscale and encode a frame for upload"""
+        try:
+            # Downscale to what the detection pipeline needs
+            frame = self.downscale_frame(frame)
 
             # Encode as JPEG
-            _, buffer = cv2.imencode(
-                '.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
-            image_bytes = buffer.tobytes()
+            image_bytes = self.encode_frame(frame)
 
             logger.info(
                 f"[{self.node_id}] Frame captured - Size: {len(image_bytes)} bytes")
 
             # Save locally if configured
             if self.save_local_copy:
-                self.save_frame_locally(frame)
+                self.save_frame_locally(image_bytes)
 
             return image_bytes
 
         except Exception as e:
-            logger.error(f"[{self.node_id}] Error capturing frame: {e}")
+            logger.error(f"[{self.node_id}] Error encoding frame: {e}")
             return None
 
-    def save_frame_locally(self, frame):
-        """Save frame to local storage"""
+    def _set_upload_coordinates(self, coordinates: List[List[int]]):
+        """Serialize the coordinates once and rebuild the static upload metadata"""
+        self._coordinates_json = _compact_json(coordinates)
+        # Headers over ~8KB are rejected by gunicorn (limit_request_field_size)
+        # and nginx's default buffers, so large layouts go as multipart form data
+        self._coordinates_fit_header = len(self._coordinates_json) <= MAX_COORDINATES_HEADER
+        if self.raw_upload and not self._coordinates_fit_header:
+            logger.info(
+                f"[{self.node_id}] Coordinates too large for a header "
+                f"({len(self._coordinates_json)} bytes), uploading as multipart")
+        self._static_data = {
+            'coordinates': self._coordinates_json,
+            'camera_id': self.camera_id,
+            'node_id': self.node_id
+        }
+
+    def downscale_frame(self, frame):
+        """Shrink a frame to encode_max_width, keeping the coordinates in step"""
+        height, width = frame.shape[:2]
+        if not self.encode_max_width or width <= self.encode_max_width:
+            return frame
+
+        scale = self.encode_max_width / width
+        size = (self.encode_max_width, max(1, round(height * scale)))
+
+        if self._scaled_for != (width, height):
+            # Recomputed only when the source resolution changes
+            scaled = [[round(v * scale) for v in rect] for rect in self.coordinates]
+            self._set_upload_coordinates(scaled)
+            self._scaled_for = (width, height)
+            logger.info(
+                f"[{self.node_id}] Downscaling {width}x{height} -> {size[0]}x{size[1]} before upload")
+
+        # INTER_AREA averages source pixels, the right filter for shrinking
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def encode_frame(self, frame) -> bytes:
+        """Encode a BGR frame as JPEG bytes"""
+        if TURBOJPEG_AVAILABLE:
+            return _TURBOJPEG.encode(frame, quality=self.jpeg_quality,
+                                     pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+
+        _, buffer = cv2.imencode('.jpg', frame, self._imencode_params)
+        return buffer.tobytes()
+
+    def save_frame_locally(self, image_bytes: bytes):
+        """Save the already-encoded JPEG to local storage"""
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{self.node_id}_{timestamp}.jpg"
+            # Same names as strftime('%Y%m%d_%H%M%S'), formatted once a minute
+            now = time.time()
+            minute = int(now // 60)
+            if minute != self._fname_minute:
+                self._fname_prefix = time.strftime('%Y%m%d_%H%M', time.localtime(now))
+                self._fname_minute = minute
+            filename = f"{self.node_id}_{self._fname_prefix}{int(now % 60):02d}.jpg"
             node_path = os.path.join(self.local_save_path, self.node_id)
             filepath = os.path.join(node_path, filename)
 
-            cv2.imwrite(filepath, frame)
+            # Writes the uploaded bytes; cv2.imwrite would encode the frame again
+            if self.writer is not None:
+                self.writer.write(filepath, image_bytes)
+                return
+
+            with open(filepath, 'wb') as f:
+                f.write(image_bytes)
             logger.debug(f"[{self.node_id}] Frame saved locally: {filepath}")
 
         except Exception as e:
             logger.error(f"[{self.node_id}] Error saving frame locally: {e}")
 
+    def compress_body(self, body: bytes, headers: Dict[str, str],
+                      min_saving: float = 0.03) -> bytes:
+        """
+        Compress a raw upload body, adding Content-Encoding to headers
+
+        Args:
+            body: Encoded JPEG bytes
+            headers: Request headers to update
+            min_saving: Fraction of the body that must be saved to send it compressed
+
+        Returns:
+            The compressed body, or the original if compression didn't pay off
+        """
+        if self._zstd is not None:
+            compressed = self._zstd.compress(body)
+        else:
+            compressed = gzip.compress(body, compresslevel=6)
+
+        if len(compressed) > len(body) * (1 - min_saving):
+            return body
+
+        headers['Content-Encoding'] = self.compress_upload
+        return compressed
+
     def send_to_updateraw(self, image_bytes: bytes) -> bool:
         """Send frame to /parking/updateRaw API"""
         try:
@@ -231,18 +649,25 @@ class CameraWorker:
 
             url = f"{self.api_base_url}/parking/updateRaw"
 
-            # Prepare multipart form data
-            files = {
-                'image': ('frame.jpg', image_bytes, 'image/jpeg')
-            }
-
-            data = {
-                'coordinates': json.dumps(self.coordinates),
-                'camera_id': self.camera_id,
-                'node_id': self.node_id
-            }
+            if self.raw_upload and self._coordinates_fit_header:
+                # JPEG bytes are the body as-is; metadata rides in the URL/headers
+                files = None
+                params = self._upload_params
+                data = image_bytes
+                extra_headers = {'Content-Type': 'image/jpeg',
+                                 'X-Coordinates': self._coordinates_json}
+                if self.compress_upload:
+                    data = self.compress_body(image_bytes, extra_headers)
+            else:
+                # Prepare multipart form data
+                files = {
+                    'image': ('frame.jpg', image_bytes, 'image/jpeg')
+                }
+                params = None
+                data = self._static_data
+                extra_headers = {}
 
-            headers = self.auth_manager.get_auth_headers()
+            headers = {**self.auth_manager.get_auth_headers(), **extra_headers}
 
             # Send with retry logic
             for attempt in range(self.retry_attempts):
@@ -250,9 +675,10 @@ class CameraWorker:
                     logger.info(
                         f"[{self.node_id}] Sending to {url} (attempt {attempt + 1}/{self.retry_attempts})")
 
-                    response = requests.post(
+                    response = self.session.post(
                         url,
                         headers=headers,
+                        params=params,
                         files=files,
                         data=data,
                         timeout=30
@@ -281,7 +707,7 @@ class CameraWorker:
                             f"[{self.node_id}] Token expired, re-authenticating...")
                         self.auth_manager.token = None
                         if self.auth_manager.ensure_authenticated():
-                            headers = self.auth_manager.get_auth_headers()
+                            headers = {**self.auth_manager.get_auth_headers(), **extra_headers}
                             continue
                         return False
                     else:
@@ -307,6 +733,7 @@ class CameraWorker:
     def run_loop(self):
         """Main loop for this camera"""
         logger.info(f"[{self.node_id}] Starting camera worker...")
+        pin_current_thread(self.cpu_affinity, self.node_id)
 
         # Initial camera connection
         if not self.connect_camera():
@@ -318,19 +745,14 @@ class CameraWorker:
             while self.running:
                 cycle_start = time.time()
 
-                # Capture frame
-                image_bytes = self.capture_frame()
-
-                if image_bytes is not None:
-                    # Send to cloud
-                    success = self.send_to_updateraw(image_bytes)
+                # Capture frame; encoding and upload run on the shared pool so
+                # this thread stays on the capture cadence
+                t0 = time.perf_counter()
+                frame = self.read_frame()
+                self.record_timing('capture_ms', (time.perf_counter() - t0) * 1000)
 
-                    if success:
-                        logger.info(
-                            f"[{self.node_id}] Cycle completed successfully")
-                    else:
-                        logger.warning(
-                            f"[{self.node_id}] Failed to send to cloud")
+                if frame is not None:
+                    self.submit_frame(frame)
                 else:
                     logger.error(f"[{self.node_id}] Failed to capture frame")
 
@@ -348,6 +770,84 @@ class CameraWorker:
         finally:
             self.stop()
 
+    def submit_frame(self, frame):
+        """Hand a frame to the encode/upload stage"""
+        if self.executor is None:
+            self._encode_and_send(frame)
+            return
+
+        with self._pending_lock:
+            if len(self._pending) == self.upload_queue_size:
+                # deque(maxlen) evicts the oldest frame on append
+                self.frames_dropped += 1
+                logger.warning(
+                    f"[{self.node_id}] Upload queue full, dropping oldest frame "
+                    f"({self.frames_dropped} dropped so far)")
+            self._pending.append(frame)
+            if len(self._pending) > self._pending_high_water:
+                self._pending_high_water = len(self._pending)
+                logger.info(
+                    f"[{self.node_id}] Upload queue high-water mark: "
+                    f"{self._pending_high_water}/{self.upload_queue_size}")
+            if self._pending_busy:
+                return
+            self._pending_busy = True
+
+        self.executor.submit(self._drain_pending)
+
+    def _drain_pending(self):
+        # At most one of these runs per camera, so frames go out in order
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    self._pending_busy = False
+                    return
+                frame = self._pending.popleft()
+            try:
+                self._encode_and_send(frame)
+            except Exception as e:
+                logger.error(f"[{self.node_id}] Error in upload stage: {e}")
+
+    def _encode_and_send(self, frame):
+        """Encode a frame and send it to the cloud"""
+        t0 = time.perf_counter()
+        image_bytes = self.prepare_upload(frame)
+        t1 = time.perf_counter()
+        self.record_timing('encode_ms', (t1 - t0) * 1000)
+        if image_bytes is None:
+            return
+
+        # Send to cloud
+        sent = self.send_to_updateraw(image_bytes)
+        self.record_timing('upload_ms', (time.perf_counter() - t1) * 1000)
+        if sent:
+            logger.info(
+                f"[{self.node_id}] Cycle completed successfully")
+        else:
+            logger.warning(
+                f"[{self.node_id}] Failed to send to cloud")
+
+    def record_timing(self, phase: str, ms: float, alpha: float = 0.1):
+        """
+        Fold a phase timing into its moving average
+
+        Args:
+            phase: Key in self.stats
+            ms: Measured duration in milliseconds
+            alpha: Weight of the new sample
+        """
+        old = self.stats[phase]
+        # The first sample seeds the average instead of being pulled toward 0
+        self.stats[phase] = ms if old == 0.0 else (1 - alpha) * old + alpha * ms
+
+    def stats_summary(self) -> str:
+        """One-line summary of timings and upload queue state"""
+        return (f"[{self.node_id}] capture {self.stats['capture_ms']:.1f}ms, "
+                f"encode {self.stats['encode_ms']:.1f}ms, "
+                f"upload {self.stats['upload_ms']:.1f}ms, "
+                f"queue {len(self._pending)}/{self.upload_queue_size} "
+                f"(peak {self._pending_high_water}), dropped {self.frames_dropped}")
+
     def start(self):
         """Start the camera worker in a separate thread"""
         if not self.enabled:
@@ -365,7 +865,7 @@ class CameraWorker:
         self.running = False
 
         if self.cap is not None:
-            self.cap.release()
+            self.release_camera()
             logger.info(f"[{self.node_id}] Camera released")
 
         if self.thread is not None:
@@ -390,26 +890,53 @@ class EdgeServer:
             raise ValueError(
                 "Missing required server configuration (api_base_url, username, password)")
 
+        # Create camera workers
+        self.workers: List[CameraWorker] = []
+        cameras = self.config.get('cameras', [])
+
+        if not cameras:
+            raise ValueError("No cameras configured in config.json")
+
+        # One keep-alive session for every camera, so uploads reuse pooled
+        # connections instead of a new TCP/TLS handshake each cycle. Retries
+        # are handled by send_to_updateraw.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(1, len(cameras)),
+                              pool_maxsize=max(16, len(cameras) * 2),
+                              max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Encode + upload pool shared by all cameras; cv2/turbojpeg encoding
+        # and socket I/O release the GIL, so cameras overlap, while the bound
+        # keeps a 4-core Pi from being oversubscribed
+        self.executor = ThreadPoolExecutor(
+            max_workers=min(8, 2 * (os.cpu_count() or 1)),
+            thread_name_prefix='edge-upload')
+
         # Initialize authentication manager
         self.auth_manager = AuthManager(
-            self.api_base_url, self.username, self.password)
+            self.api_base_url, self.username, self.password, session=self.session)
 
         # Local settings
         self.local_settings = self.config.get('local_settings', {})
+        self.writer = LocalFrameWriter() if self.local_settings.get('save_local_copy') else None
 
-        # Create camera workers
-        self.workers: List[CameraWorker] = []
-        cameras = self.config.get('cameras', [])
+        # Set to shut down; the main thread sleeps on it instead of polling
+        self._stop_evt = threading.Event()
 
-        if not cameras:
-            raise ValueError("No cameras configured in config.json")
+        # Seconds between per-camera timing reports; 0 disables them
+        self.stats_interval = self.local_settings.get('stats_interval', 30)
 
         for cam_config in cameras:
             worker = CameraWorker(
                 cam_config,
                 self.auth_manager,
                 server_config,
-                self.local_settings
+                self.local_settings,
+                session=self.session,
+                executor=self.executor,
+                writer=self.writer
             )
             self.workers.append(worker)
 
@@ -468,10 +995,16 @@ class EdgeServer:
         logger.info("Press Ctrl+C to stop")
         logger.info("="*70)
 
+        if self.stats_interval:
+            threading.Thread(target=self._report_stats, name='edge-stats', daemon=True).start()
+
+        # systemd stops the service with SIGTERM
+        signal.signal(signal.SIGTERM, lambda *_: self._stop_evt.set())
+
         try:
-            # Keep main thread alive
-            while True:
-                time.sleep(1)
+            # Keep main thread alive until asked to stop
+            self._stop_evt.wait()
+            logger.info("⚠️  Received shutdown signal...")
 
         except KeyboardInterrupt:
             logger.info("\n⚠️  Received shutdown signal...")
@@ -480,8 +1013,16 @@ class EdgeServer:
         finally:
             self.stop()
 
+    def _report_stats(self):
+        while not self._stop_evt.wait(self.stats_interval):
+            for worker in self.workers:
+                if worker.running:
+                    logger.info(f"📊 {worker.stats_summary()}")
+
     def stop(self):
         """Stop all camera workers"""
+        self._stop_evt.set()
+
         logger.info("="*70)
         logger.info("🛑 Stopping all camera workers...")
         logger.info("="*70)
@@ -489,6 +1030,12 @@ class EdgeServer:
         for worker in self.workers:
             worker.stop()
 
+        # Let in-flight uploads finish before closing their connections
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.writer is not None:
+            self.writer.stop()
+
         logger.info("✅ All workers stopped")
         logger.info("="*70)
 
@@ -7,7 +7,9 @@ Run this once to fix any previously uploaded images
 import os
 import sys
 import logging
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
 from google.oauth2 import service_account
 
 # Get environment variables
@@ -24,6 +26,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Concurrent ACL updates; each make_public() is one blocking HTTPS round-trip
+ACL_WORKERS = int(get_env('GCS_ACL_WORKERS', 64))
+# Updates submitted but not yet finished; bounds memory on large buckets
+MAX_IN_FLIGHT = ACL_WORKERS * 4
+# make_public() only needs the blob name (it loads the ACL itself), so list
+# full-size pages carrying nothing but names
+LIST_PAGE_SIZE = 1000
+LIST_FIELDS = 'items(name),nextPageToken'
+
+
+def make_blobs_public(client, blobs, progress_every: int = 100):
+    """
+    Make blobs publicly readable, updating their ACLs concurrently
+
+    Args:
+        client: GCS client whose HTTP session the workers share
+        blobs: Iterable of blobs to update
+        progress_every: Log progress after this many completions
+
+    Returns:
+        (count, success, failed)
+    """
+    # Let every worker keep its own pooled connection (requests defaults to 10)
+    client._http.mount('https://', HTTPAdapter(pool_maxsize=ACL_WORKERS))
+
+    count = 0
+    success = 0
+    failed = 0
+    pending = {}
+
+    def drain(return_when):
+        # Results are consumed on this thread, so the counters need no locking
+        nonlocal count, success, failed
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            name = pending.pop(future)
+            count += 1
+            try:
+                future.result()
+                success += 1
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to make {name} public: {e}")
+            if count % progress_every == 0:
+                logger.info(
+                    f"Processed {count} images... ({success} successful)")
+
+    with ThreadPoolExecutor(max_workers=ACL_WORKERS) as executor:
+        # Listing pages and ACL updates overlap: updates start as soon as the
+        # first page arrives, and listing pauses while the window is full
+        for blob in blobs:
+            pending[executor.submit(blob.make_public)] = blob.name
+            if len(pending) >= MAX_IN_FLIGHT:
+                drain(FIRST_COMPLETED)
+
+        if pending:
+            drain(ALL_COMPLETED)
+
+    return count, success, failed
+
 
 def make_bucket_images_public(bucket_name: str, credentials_path: str = None):
     """Make all images in bucket publicly readable"""
@@ -44,24 +106,11 @@ def make_bucket_images_public(bucket_name: str, credentials_path: str = None):
         logger.info(f"✅ Connected to bucket: {bucket_name}")
 
         # List all blobs
-        blobs = client.list_blobs(bucket_name)
+        blobs = client.list_blobs(
+            bucket_name, page_size=LIST_PAGE_SIZE, fields=LIST_FIELDS)
 
-        count = 0
-        success = 0
-        failed = 0
-
-        for blob in blobs:
-            count += 1
-            try:
-                # Make blob publicly readable
-                blob.make_public()
-                success += 1
-                if count % 10 == 0:
-                    logger.info(
-                        f"Processed {count} images... ({success} successful)")
-            except Exception as e:
-                failed += 1
-                logger.error(f"Failed to make {blob.name} public: {e}")
+        # Make blobs publicly readable
+        count, success, failed = make_blobs_public(client, blobs)
 
         logger.info("\n" + "="*60)
         logger.info("SUMMARY")
@@ -95,24 +144,12 @@ def make_user_images_public(bucket_name: str, user_id: str, credentials_path: st
 
         # List blobs with user prefix
         prefix = f"{user_id}/"
-        blobs = client.list_blobs(bucket_name, prefix=prefix)
-
-        count = 0
-        success = 0
-        failed = 0
+        blobs = client.list_blobs(
+            bucket_name, prefix=prefix, page_size=LIST_PAGE_SIZE, fields=LIST_FIELDS)
 
         logger.info(f"Making images public for user: {user_id}")
 
-        for blob in blobs:
-            count += 1
-            try:
-                blob.make_public()
-                success += 1
-                if count % 10 == 0:
-                    logger.info(f"Processed {count} images...")
-            except Exception as e:
-                failed += 1
-                logger.error(f"Failed to make {blob.name} public: {e}")
+        count, success, failed = make_blobs_public(client, blobs)
 
         logger.info(
             f"\n✅ Made {success}/{count} images public for user {user_id}")
@@ -4,9 +4,13 @@ Fix GCS URLs for existing parking data records
 Regenerates signed URLs for all images stored in GCS
 """
 
+import itertools
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from config.database import db
 from utils.gcs_storage import gcs_storage
 
@@ -16,6 +20,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# URL updates sent to MongoDB per bulk_write round-trip
+BULK_WRITE_SIZE = 500
+# Concurrent signed-URL generations (IAM signBlob calls or local RSA signing)
+SIGN_WORKERS = 32
+# Signed URLs are valid for 7 days
+SIGNED_URL_MINUTES = 7 * 24 * 60
+
+
+def image_paths(record):
+    """
+    List the GCS images stored for a record
+
+    Args:
+        record: parking_data document
+
+    Returns:
+        [(image_key, blob_path), ...] for raw_image/annotated_image
+    """
+    gcs_data = record.get('gcs_storage') or {}
+    return [
+        (image, gcs_data[image]['path'])
+        for image in ('raw_image', 'annotated_image')
+        if gcs_data.get(image) and gcs_data[image].get('path')
+    ]
+
+
+def flush_updates(ops) -> int:
+    """
+    Apply queued URL updates in one unordered bulk write
+
+    Args:
+        ops: UpdateOne operations; cleared once sent
+
+    Returns:
+        Number of operations that failed
+    """
+    if not ops:
+        return 0
+
+    try:
+        # Unordered: one failing update doesn't stop the rest of the batch
+        db.parking_data.bulk_write(ops, ordered=False)
+        failed = 0
+    except BulkWriteError as e:
+        failed = len(e.details.get('writeErrors', []))
+        logger.error(f"❌ {failed} of {len(ops)} updates in batch failed")
+    ops.clear()
+    return failed
+
 
 def fix_gcs_urls(dry_run=True):
     """
@@ -52,66 +105,50 @@ def fix_gcs_urls(dry_run=True):
     # Process records
     updated_count = 0
     error_count = 0
+    ops = []
+
+    # Only the blob paths are read; skipping the rest of each document
+    # (slot details, detections) saves transfer and BSON decoding
+    cursor = db.parking_data.find(
+        query,
+        projection={'gcs_storage.raw_image.path': 1, 'gcs_storage.annotated_image.path': 1},
+        batch_size=1000
+    )
 
-    cursor = db.parking_data.find(query)
-
-    for record in cursor:
-        record_id = record['_id']
-        gcs_data = record.get('gcs_storage', {})
-
-        try:
-            updated = False
-
-            # Fix raw image URL
-            raw_image = gcs_data.get('raw_image')
-            if raw_image and raw_image.get('path'):
-                blob_path = raw_image['path']
-                logger.info(f"  🔄 Generating signed URL for: {blob_path}")
-
-                # Generate signed URL (7 days expiration)
-                new_url = gcs_storage.get_signed_url(
-                    blob_path, expiration_minutes=7*24*60)
-
-                if new_url:
-                    if not dry_run:
-                        db.parking_data.update_one(
-                            {'_id': record_id},
-                            {'$set': {'gcs_storage.raw_image.url': new_url}}
-                        )
-                    logger.info(f"    ✅ Raw image URL updated")
-                    updated = True
-                else:
-                    logger.warning(
-                        f"    ⚠️ Failed to generate URL for raw image")
-
-            # Fix annotated image URL
-            annotated_image = gcs_data.get('annotated_image')
-            if annotated_image and annotated_image.get('path'):
-                blob_path = annotated_image['path']
-                logger.info(f"  🔄 Generating signed URL for: {blob_path}")
-
-                new_url = gcs_storage.get_signed_url(
-                    blob_path, expiration_minutes=7*24*60)
-
-                if new_url:
+    try:
+        with ThreadPoolExecutor(max_workers=SIGN_WORKERS) as executor:
+            # BULK_WRITE_SIZE records at a time: their URLs are signed concurrently,
+            # then written back in one bulk_write
+            for chunk in iter(lambda: list(itertools.islice(cursor, BULK_WRITE_SIZE)), []):
+                tasks = [
+                    (record['_id'], image, path)
+                    for record in chunk
+                    for image, path in image_paths(record)
+                ]
+                urls = executor.map(
+                    lambda task: gcs_storage.get_signed_url(
+                        task[2], expiration_minutes=SIGNED_URL_MINUTES),
+                    tasks)
+
+                # Both URLs of a record go out in one update
+                updates = {}
+                for (record_id, image, path), new_url in zip(tasks, urls):
+                    if new_url:
+                        updates.setdefault(record_id, {})[f'gcs_storage.{image}.url'] = new_url
+                    else:
+                        logger.warning(f"    ⚠️ Failed to generate URL for {image}: {path}")
+
+                for record_id, fields in updates.items():
                     if not dry_run:
-                        db.parking_data.update_one(
-                            {'_id': record_id},
-                            {'$set': {'gcs_storage.annotated_image.url': new_url}}
-                        )
-                    logger.info(f"    ✅ Annotated image URL updated")
-                    updated = True
-                else:
-                    logger.warning(
-                        f"    ⚠️ Failed to generate URL for annotated image")
-
-            if updated:
-                updated_count += 1
-                logger.info(f"✅ Record {record_id} - URLs updated")
-
-        except Exception as e:
-            error_count += 1
-            logger.error(f"❌ Error processing record {record_id}: {e}")
+                        ops.append(UpdateOne({'_id': record_id}, {'$set': fields}))
+                    updated_count += 1
+                    logger.info(f"✅ Record {record_id} - URLs updated")
+
+                failed = flush_updates(ops)
+                updated_count -= failed
+                error_count += failed
+    finally:
+        cursor.close()
 
     # Summary
     logger.info("\n" + "="*60)
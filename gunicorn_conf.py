@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for production
+
+Usage:
+    gunicorn -c gunicorn_conf.py app:app
+
+Every setting can be overridden with the GUNICORN_* environment variables below.
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('FLASK_PORT', 80)}")
+
+# Each worker process holds its own copy of the YOLO model, so the usual
+# 2 * CPU + 1 rule would exhaust memory; concurrency comes from threads instead.
+# Threaded workers also let concurrent detections share a batched forward pass.
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Import the app once in the master so workers fork with the code (and any
+# preloaded model weights) already in memory, shared copy-on-write
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Give each worker its own MongoDB client; pymongo clients are not fork-safe"""
+    from config.database import db
+    db.reset_after_fork()
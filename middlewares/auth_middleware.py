@@ -2,15 +2,59 @@
 Authentication Middleware - JWT verification decorators
 """
 
+import os
+import threading
+import time
 from functools import wraps
-from flask import jsonify, request
+from cachetools import TTLCache
+from flask import g, jsonify, request
 
 try:
-    from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+    from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
     JWT_AVAILABLE = True
 except ImportError:
     JWT_AVAILABLE = False
 
+# Claims of recently verified tokens, keyed by the raw token string. Edge
+# devices send the same token on every update, so a hit skips the signature
+# check; entries are still rejected once the token's own exp has passed.
+_TOKEN_CACHE = TTLCache(maxsize=50_000, ttl=int(os.getenv('TOKEN_CACHE_TTL', 60)))
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def _verify_token_cached() -> str:
+    """
+    Verify the request's JWT, reusing claims for recently verified tokens
+
+    Returns:
+        Identity of the token
+
+    Raises:
+        flask_jwt_extended exceptions if the token is missing or invalid
+    """
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header[7:].strip() if auth_header.startswith('Bearer ') else None
+
+    if token:
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(token)
+        if cached is not None:
+            identity, claims = cached
+            exp = claims.get('exp')
+            if exp is None or exp > time.time():
+                g.jwt_claims = claims
+                return identity
+
+    verify_jwt_in_request()
+    identity = get_jwt_identity()
+    g.jwt_claims = get_jwt()
+
+    if token:
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[token] = (identity, g.jwt_claims)
+
+    return identity
+
 
 def token_required(f):
     """
@@ -20,8 +64,7 @@ def token_required(f):
         @app.route('/protected')
         @token_required
         def protected_route():
-            user_id = get_jwt_identity()
-            return {'user_id': user_id}
+            return {'user_id': g.user_id}
     """
     if not JWT_AVAILABLE:
         # If JWT not available, create a passthrough decorator
@@ -31,8 +74,9 @@ def token_required(f):
         return decorated_function
 
     @wraps(f)
-    @jwt_required()
     def decorated_function(*args, **kwargs):
+        # Resolve the identity once per request for the endpoint and models
+        g.user_id = _verify_token_cached()
         return f(*args, **kwargs)
 
     return decorated_function
@@ -48,7 +92,7 @@ def api_key_or_token_required(f):
         @api_key_or_token_required
         def update_parking():
             # Access works with either JWT or API key
-            return {'status': 'success'}
+            return {'user_id': g.user_id}
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -61,7 +105,7 @@ def api_key_or_token_required(f):
         if auth_header.startswith('Bearer '):
             try:
                 if JWT_AVAILABLE:
-                    verify_jwt_in_request()
+                    g.user_id = _verify_token_cached()
                     # JWT is valid, proceed
                     return f(*args, **kwargs)
             except:
@@ -80,6 +124,7 @@ def api_key_or_token_required(f):
                 # API key is valid, inject user_id into request context
                 # so that jwt_handler.get_current_user_id() works
                 request.current_user_id = user['user_id']
+                g.user_id = user['user_id']
                 return f(*args, **kwargs)
 
         # Neither JWT nor API key worked
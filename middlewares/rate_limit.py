@@ -0,0 +1,56 @@
+"""
+Rate Limiting Middleware - request budgets for expensive endpoints
+"""
+
+import os
+from flask import Flask, request
+
+try:
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+    LIMITER_AVAILABLE = True
+except ImportError:
+    LIMITER_AVAILABLE = False
+    print("⚠️  Warning: Flask-Limiter not installed. Rate limiting disabled.")
+
+
+def login_rate_key() -> str:
+    """Rate limit key for login attempts: client address plus attempted username"""
+    data = request.get_json(silent=True)
+    username = data.get('username', '') if isinstance(data, dict) else ''
+    return f"{get_remote_address()}:{str(username).strip()}"
+
+
+class RateLimiter:
+    """Thin wrapper so endpoints can declare limits whether or not Flask-Limiter is installed"""
+
+    def __init__(self):
+        """Create the limiter; storage defaults to in-process memory"""
+        self.limiter = None
+        if LIMITER_AVAILABLE:
+            # Use a shared backend (e.g. redis://) so limits hold across workers
+            self.limiter = Limiter(
+                get_remote_address,
+                storage_uri=os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
+            )
+
+    def init_app(self, app: Flask):
+        """Attach the limiter to the Flask app"""
+        if self.limiter is not None:
+            self.limiter.init_app(app)
+
+    def limit(self, limit_value: str, key_func=None):
+        """
+        Decorator applying a rate limit to an endpoint
+
+        Args:
+            limit_value: Limit string, e.g. "5/minute;20/hour"
+            key_func: Function returning the bucket key (defaults to client address)
+        """
+        if self.limiter is None:
+            return lambda f: f
+        return self.limiter.limit(limit_value, key_func=key_func)
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
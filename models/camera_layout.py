@@ -0,0 +1,119 @@
+"""
+Camera Layout Model - Parking slot coordinates registered once per camera
+"""
+
+import base64
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+from config.database import db
+
+# Layout ids are derived from their content, so a cached layout never goes stale
+_LAYOUT_CACHE = LRUCache(maxsize=4096)
+_LAYOUT_CACHE_LOCK = threading.Lock()
+
+
+class CameraLayout:
+    """Registered slot coordinates that edge updates refer to by layout_id"""
+
+    @staticmethod
+    def register(user_id: str, camera_id: str, coordinates: List[List[int]]) -> str:
+        """
+        Register (or re-register) a camera's slot layout
+
+        Args:
+            user_id: User identifier
+            camera_id: Camera identifier
+            coordinates: Parking slot coordinates [[x1, y1, x2, y2], ...]
+
+        Returns:
+            Layout ID, identical for identical layouts of the same camera
+        """
+        if not db.is_connected():
+            raise Exception("Database not connected")
+
+        key = json.dumps([user_id, camera_id, coordinates], separators=(',', ':'))
+        layout_id = hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]
+
+        layout = {
+            'layout_id': layout_id,
+            'user_id': user_id,
+            'camera_id': camera_id,
+            'coordinates': coordinates,
+            'total_slots': len(coordinates)
+        }
+
+        db.camera_layouts.update_one(
+            {'layout_id': layout_id},
+            {'$setOnInsert': dict(layout, created_at=datetime.utcnow())},
+            upsert=True
+        )
+
+        with _LAYOUT_CACHE_LOCK:
+            _LAYOUT_CACHE[layout_id] = layout
+
+        return layout_id
+
+    @staticmethod
+    def find(user_id: str, layout_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a layout owned by the user
+
+        Args:
+            user_id: User identifier
+            layout_id: Layout identifier returned by register()
+
+        Returns:
+            Layout document or None
+        """
+        with _LAYOUT_CACHE_LOCK:
+            layout = _LAYOUT_CACHE.get(layout_id)
+
+        if layout is None:
+            layout = db.camera_layouts.find_one({'layout_id': layout_id}, {'_id': 0})
+            if layout is None:
+                return None
+            with _LAYOUT_CACHE_LOCK:
+                _LAYOUT_CACHE[layout_id] = layout
+
+        if layout['user_id'] != user_id:
+            return None
+        return layout
+
+    @staticmethod
+    def expand_bitmap(layout: Dict[str, Any], occupied_bitmap: str) -> Tuple[int, List[Dict]]:
+        """
+        Rebuild per-slot details from a packed occupancy bitmap
+
+        Args:
+            layout: Layout document
+            occupied_bitmap: Base64 of np.packbits(mask), one bit per slot
+
+        Returns:
+            (occupied_count, slots_details)
+
+        Raises:
+            ValueError: If the bitmap is malformed or too short for the layout
+        """
+        total = layout['total_slots']
+        try:
+            packed = np.frombuffer(base64.b64decode(occupied_bitmap, validate=True), dtype=np.uint8)
+        except (ValueError, TypeError):
+            raise ValueError("occupied_bitmap is not valid base64")
+
+        if packed.size * 8 < total:
+            raise ValueError(f"occupied_bitmap has {packed.size * 8} bits, layout has {total} slots")
+
+        occupied = np.unpackbits(packed, count=total).astype(bool)
+
+        slots_details = [
+            {'slot_id': i, 'coordinates': coord, 'is_occupied': is_occupied}
+            for i, (coord, is_occupied) in enumerate(zip(layout['coordinates'], occupied.tolist()))
+        ]
+
+        return int(occupied.sum()), slots_details
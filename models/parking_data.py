@@ -2,10 +2,130 @@
 Parking Data Model - Handles parking detection records
 """
 
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
+from bson import ObjectId
+from cachetools import TTLCache
+from pymongo.errors import BulkWriteError
 from config.database import db
 
+logger = logging.getLogger(__name__)
+
+# Short-lived per-user cache of find_by_user total counts, so paging through
+# results does not re-run count_documents on every request. Inserts made by
+# this process drop the user's entry; other workers catch up within the TTL.
+_COUNT_CACHE = TTLCache(maxsize=10_000, ttl=30)
+_COUNT_CACHE_LOCK = threading.Lock()
+
+
+class _WriteBatcher:
+    """Buffers parking_data inserts and writes them with insert_many"""
+
+    # Clients already hold the ids of buffered documents, so failed inserts
+    # are retried (with backoff) before anything is given up
+    WRITE_ATTEMPTS = 3
+    RETRY_DELAY = 0.5
+    DUPLICATE_KEY = 11000
+
+    def __init__(self, max_batch: int = 100, flush_interval: float = 0.25,
+                 max_queued: int = 10_000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, document: Dict[str, Any]):
+        """Queue a document, writing it directly if the buffer is full"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(document)
+        except queue.Full:
+            logger.warning("parking_data write buffer full, inserting synchronously")
+            self._write([document])
+
+    def flush(self):
+        """Write everything currently queued"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _ensure_started(self):
+        # Started lazily so each gunicorn worker gets its own thread after fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='parking-data-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    @classmethod
+    def _write(cls, batch: List[Dict[str, Any]]):
+        pending = batch
+        for attempt in range(cls.WRITE_ATTEMPTS):
+            try:
+                db.parking_data.insert_many(pending, ordered=False)
+                pending = []
+            except BulkWriteError as e:
+                # Duplicate keys are documents an earlier attempt already wrote
+                failed = {err['index'] for err in e.details.get('writeErrors', [])
+                          if err.get('code') != cls.DUPLICATE_KEY}
+                pending = [doc for i, doc in enumerate(pending) if i in failed]
+                error = e
+            except Exception as e:
+                # Unknown outcome (e.g. network error): retry all of it
+                error = e
+
+            if not pending:
+                break
+            if attempt + 1 < cls.WRITE_ATTEMPTS:
+                logger.warning("⚠️ Retrying %d of %d parking records after: %s",
+                               len(pending), len(batch), error)
+                time.sleep(cls.RETRY_DELAY * 2 ** attempt)
+
+        if pending:
+            logger.error("❌ Dropped %d parking records after %d attempts (%s): ids %s",
+                         len(pending), cls.WRITE_ATTEMPTS, error,
+                         [str(doc['_id']) for doc in pending])
+
+        for user_id in {doc['user_id'] for doc in batch}:
+            ParkingData.invalidate_counts(user_id)
+
+
+# Deferred inserts are acknowledged with a pre-generated id and become visible
+# to readers once the batch is flushed (at most flush_interval later)
+_write_batcher = _WriteBatcher(
+    max_batch=int(os.getenv('PARKING_WRITE_BATCH_SIZE', 100)),
+    flush_interval=float(os.getenv('PARKING_WRITE_FLUSH_MS', 250)) / 1000
+)
+atexit.register(_write_batcher.flush)
+
 
 class ParkingData:
     """Parking data model for detection records"""
@@ -23,7 +143,8 @@ class ParkingData:
                                    gcs_raw_image_url: Optional[str] = None,
                                    gcs_annotated_image_path: Optional[str] = None,
                                    gcs_annotated_image_url: Optional[str] = None,
-                                   timestamp: Optional[datetime] = None) -> str:
+                                   timestamp: Optional[datetime] = None,
+                                   deferred: bool = False) -> str:
         """
         Create parking data record from raw image processing
 
@@ -45,6 +166,8 @@ class ParkingData:
             gcs_annotated_image_path: GCS path for annotated image
             gcs_annotated_image_url: Public URL for annotated image
             timestamp: Custom timestamp (optional, defaults to current UTC time)
+            deferred: Queue the insert for the background batch writer instead
+                of writing it before returning
 
         Returns:
             Inserted document ID
@@ -79,7 +202,11 @@ class ParkingData:
             }
         }
 
+        if deferred:
+            return ParkingData._insert_deferred(document)
+
         result = db.parking_data.insert_one(document)
+        ParkingData.invalidate_counts(user_id)
         return str(result.inserted_id)
 
     @staticmethod
@@ -89,17 +216,66 @@ class ParkingData:
                                     total_cars_detected: Optional[int] = None,
                                     slots_details: Optional[List[Dict]] = None,
                                     coordinates: Optional[List[List[int]]] = None,
-                                    additional_data: Optional[Dict] = None) -> str:
+                                    additional_data: Optional[Dict] = None,
+                                    deferred: bool = False) -> str:
         """
         Create parking data record from edge device processing
 
+        Args:
+            deferred: Queue the insert for the background batch writer instead
+                of writing it before returning
+
         Returns:
             Inserted document ID
         """
         if not db.is_connected():
             raise Exception("Database not connected")
 
-        document = {
+        document = ParkingData._edge_document(
+            user_id, camera_id, total_slots, occupied_slots, empty_slots,
+            occupancy_rate, total_cars_detected, slots_details, coordinates,
+            additional_data)
+
+        if deferred:
+            return ParkingData._insert_deferred(document)
+
+        result = db.parking_data.insert_one(document)
+        ParkingData.invalidate_counts(user_id)
+        return str(result.inserted_id)
+
+    @staticmethod
+    def create_many_from_edge_processing(records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create several edge processing records with one unordered insert_many
+
+        Args:
+            records: create_from_edge_processing keyword arguments, one per record
+
+        Returns:
+            Inserted document IDs, in the order of records
+        """
+        if not db.is_connected():
+            raise Exception("Database not connected")
+
+        documents = [ParkingData._edge_document(**record) for record in records]
+
+        # Unordered lets the server apply the inserts (and index updates) in parallel
+        result = db.parking_data.insert_many(documents, ordered=False)
+
+        for user_id in {doc['user_id'] for doc in documents}:
+            ParkingData.invalidate_counts(user_id)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+    @staticmethod
+    def _edge_document(user_id: str, camera_id: str,
+                       total_slots: int, occupied_slots: int,
+                       empty_slots: int, occupancy_rate: float,
+                       total_cars_detected: Optional[int] = None,
+                       slots_details: Optional[List[Dict]] = None,
+                       coordinates: Optional[List[List[int]]] = None,
+                       additional_data: Optional[Dict] = None) -> Dict[str, Any]:
+        """Build a parking_data document for an edge-processed update"""
+        return {
             'user_id': user_id,
             'camera_id': camera_id,
             'timestamp': datetime.utcnow(),
@@ -114,17 +290,59 @@ class ParkingData:
             'additional_data': additional_data or {}
         }
 
-        result = db.parking_data.insert_one(document)
-        return str(result.inserted_id)
+    @staticmethod
+    def _insert_deferred(document: Dict[str, Any]) -> str:
+        """Assign an id and hand the document to the batch writer"""
+        document['_id'] = ObjectId()
+        _write_batcher.put(document)
+        return str(document['_id'])
+
+    @staticmethod
+    def invalidate_counts(user_id: str):
+        """Drop cached record counts for a user after their data changed"""
+        with _COUNT_CACHE_LOCK:
+            _COUNT_CACHE.pop(user_id, None)
+
+    @staticmethod
+    def cached_count(user_id: str, count_key: tuple, query: Dict[str, Any],
+                     exact: bool = False) -> int:
+        """
+        Count a user's matching records, reusing a count from the last 30 seconds
+
+        Args:
+            user_id: User identifier the query is scoped to
+            count_key: Hashable key identifying the filter combination
+            query: MongoDB filter passed to count_documents
+            exact: Skip the cache and always count
+
+        Returns:
+            Number of matching records
+        """
+        total_count = None
+        if not exact:
+            with _COUNT_CACHE_LOCK:
+                total_count = _COUNT_CACHE.get(user_id, {}).get(count_key)
+
+        if total_count is None:
+            total_count = db.parking_data.count_documents(query)
+            with _COUNT_CACHE_LOCK:
+                _COUNT_CACHE.setdefault(user_id, {})[count_key] = total_count
+
+        return total_count
 
     @staticmethod
     def find_by_user(user_id: str, camera_id: Optional[str] = None,
                      start_date: Optional[datetime] = None,
                      end_date: Optional[datetime] = None,
-                     limit: int = 50, skip: int = 0) -> Dict[str, Any]:
+                     limit: int = 50, skip: int = 0,
+                     exact_count: bool = False) -> Dict[str, Any]:
         """
         Find parking data for a user with optional filters
 
+        Args:
+            exact_count: Always run count_documents instead of using a
+                count cached within the last 30 seconds
+
         Returns:
             Dictionary with data array, count, and latest summary
         """
@@ -144,8 +362,9 @@ class ParkingData:
             if end_date:
                 query['timestamp']['$lte'] = end_date
 
-        # Get total count
-        total_count = db.parking_data.count_documents(query)
+        # Get total count (cached briefly per filter combination)
+        total_count = ParkingData.cached_count(
+            user_id, (camera_id, start_date, end_date), query, exact=exact_count)
 
         # Get paginated data
         cursor = db.parking_data.find(query).sort(
@@ -205,4 +424,5 @@ class ParkingData:
             'timestamp': {'$lt': cutoff_date}
         })
 
+        ParkingData.invalidate_counts(user_id)
         return result.deleted_count
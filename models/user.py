@@ -20,7 +20,7 @@ class User:
 
         Args:
             username: Unique username
-            hashed_password: Bcrypt hashed password
+            hashed_password: Hashed password
             organization_name: Organization/Company name
             location: Physical address
             size: Parking lot capacity
@@ -84,6 +84,25 @@ class User:
         )
         return result.modified_count > 0
 
+    @staticmethod
+    def update_password_hash(user_id: str, hashed_password: str) -> bool:
+        """Replace a user's stored password hash (e.g. after a KDF upgrade)"""
+        if not db.is_connected():
+            return False
+
+        result = db.users.update_one(
+            {'user_id': user_id},
+            {'$set': {'password': hashed_password, 'updated_at': datetime.utcnow()}}
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    def estimated_count() -> int:
+        """Approximate number of users, read from collection metadata"""
+        if not db.is_connected():
+            return 0
+        return db.users.estimated_document_count()
+
     @staticmethod
     def username_exists(username: str) -> bool:
         """Check if username already exists"""
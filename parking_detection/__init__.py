@@ -16,7 +16,7 @@ Author: AI Assistant
 Version: 2.0.0
 """
 
-from .core import ParkingDetectionSystem, VehicleDetector, ParkingManager, ParkingVisualizer
+from .core import ParkingDetectionSystem, VehicleDetector, ParkingManager, ParkingVisualizer, DetectionBatcher
 from .config import CONFIG
 from .utils import *
 
@@ -28,5 +28,6 @@ __all__ = [
     'VehicleDetector',
     'ParkingManager',
     'ParkingVisualizer',
+    'DetectionBatcher',
     'CONFIG'
 ]
@@ -12,6 +12,7 @@ class ModelConfig:
     model_path: str = "runs/detect/carpk_demo/weights/best.pt"
     confidence_threshold: float = 0.25
     device: str = "auto"  # "auto", "cpu", "cuda"
+    half_precision: bool = True  # FP16 inference when running on CUDA
     
 @dataclass
 class ParkingConfig:
@@ -20,6 +21,7 @@ class ParkingConfig:
     slot_width: int = 107
     slot_height: int = 48
     occupancy_threshold: float = 0.30  # 30% overlap to consider occupied
+    max_history: int = 10000  # Frames of occupancy history kept per manager
     
 @dataclass
 class VideoConfig:
@@ -83,6 +85,12 @@ def load_config_from_env():
     if os.getenv("PARKING_CONFIDENCE"):
         CONFIG.model.confidence_threshold = float(os.getenv("PARKING_CONFIDENCE"))
     
+    if os.getenv("PARKING_DEVICE"):
+        CONFIG.model.device = os.getenv("PARKING_DEVICE")
+    
+    if os.getenv("PARKING_HALF_PRECISION"):
+        CONFIG.model.half_precision = os.getenv("PARKING_HALF_PRECISION").lower() == "true"
+    
     if os.getenv("PARKING_OUTPUT_DIR"):
         CONFIG.video.output_dir = os.getenv("PARKING_OUTPUT_DIR")
         os.makedirs(CONFIG.video.output_dir, exist_ok=True)
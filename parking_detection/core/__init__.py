@@ -6,10 +6,12 @@ from .vehicle_detector import VehicleDetector
 from .parking_manager import ParkingManager
 from .visualizer import ParkingVisualizer
 from .parking_system import ParkingDetectionSystem
+from .detection_batcher import DetectionBatcher
 
 __all__ = [
     'VehicleDetector',
     'ParkingManager', 
     'ParkingVisualizer',
-    'ParkingDetectionSystem'
+    'ParkingDetectionSystem',
+    'DetectionBatcher'
 ]
@@ -0,0 +1,101 @@
+"""
+Micro-batching of vehicle detection across concurrent callers
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .vehicle_detector import VehicleDetector
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionBatcher:
+    """
+    Coalesces detection requests from several threads into one forward pass
+
+    Callers block on submit(frame).result(); a single worker thread collects
+    up to max_batch pending frames, waiting at most max_wait_ms after the
+    first one, and runs them through the detector together.
+    """
+
+    def __init__(self, model_path: Optional[str] = None,
+                 max_batch: int = 16, max_wait_ms: float = 8.0):
+        """
+        Initialize the batcher
+
+        Args:
+            model_path: Path to YOLOv8 model (uses config default if None)
+            max_batch: Maximum number of frames per forward pass
+            max_wait_ms: How long the first frame of a batch waits for others
+        """
+        self.model_path = model_path
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.detector = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """
+        Queue a frame for detection
+
+        Args:
+            frame: Input image frame
+
+        Returns:
+            Future resolving to [(x1, y1, x2, y2, confidence, class_name), ...]
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, float, str]]:
+        """Detect vehicles in a frame, sharing the forward pass with concurrent callers"""
+        return self.submit(frame).result()
+
+    def _ensure_started(self):
+        # Started lazily so each gunicorn worker gets its own thread after fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self.detector is None:
+                # Loaded here rather than in the worker so load errors reach the caller
+                self.detector = VehicleDetector(self.model_path)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='detection-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            frames = [frame for frame, _ in batch]
+            try:
+                results = self.detector.detect_vehicles_batch(frames)
+            except Exception as e:
+                logger.error(f"❌ Batched detection failed for {len(batch)} frames: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), detections in zip(batch, results):
+                future.set_result(detections)
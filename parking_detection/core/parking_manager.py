@@ -3,11 +3,13 @@ Parking occupancy detection and management
 """
 
 import logging
+from collections import deque
 from typing import List, Tuple, Dict, Optional
 import numpy as np
 
 from ..config.settings import CONFIG
-from ..utils.helpers import calculate_box_overlap_with_slot, load_parking_positions
+from ..utils.helpers import load_parking_positions
+from ..utils.detection_kernels import slot_overlap_ratios
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +26,7 @@ class ParkingManager:
         
         Args:
             parking_positions_file: Path to parking positions file (optional if positions provided)
-            parking_positions: List of coordinates in one of two formats:
+            parking_positions: List (or N x 2 / N x 4 ndarray) of coordinates in one of two formats:
                 - (x, y): Top-left corner only, uses slot_width/height
                 - (x1, y1, x2, y2): Rectangle coordinates (top-left and bottom-right)
             slot_width: Default width for (x, y) format slots
@@ -58,9 +60,9 @@ class ParkingManager:
             logger.info(f"Default slot dimensions: {self.default_slot_width}x{self.default_slot_height}")
         logger.info(f"Occupancy threshold: {self.occupancy_threshold}")
         
-        # Statistics tracking
-        self.occupancy_history = []
-        self.detection_history = []
+        # Statistics tracking (bounded, since managers live as long as their cached system)
+        self.occupancy_history = deque(maxlen=CONFIG.parking.max_history)
+        self.detection_history = deque(maxlen=CONFIG.parking.max_history)
     
     def _process_parking_positions(self, positions: List) -> None:
         """
@@ -70,11 +72,14 @@ class ParkingManager:
         1. (x, y) - top-left corner with default width/height
         2. (x1, y1, x2, y2) - rectangle with explicit boundaries
         """
-        if not positions:
+        if positions is None or len(positions) == 0:
             raise ValueError("No parking positions provided")
         
-        # Convert to list of tuples if needed
-        positions = [tuple(p) if isinstance(p, list) else p for p in positions]
+        # Convert to list of tuples if needed (ndarray rows become plain ints)
+        if isinstance(positions, np.ndarray):
+            positions = [tuple(p) for p in positions.tolist()]
+        else:
+            positions = [tuple(p) if isinstance(p, list) else p for p in positions]
         
         # Detect format from first position
         first_pos = positions[0]
@@ -94,6 +99,12 @@ class ParkingManager:
         else:
             raise ValueError(f"Invalid position format. Expected (x, y) or (x1, y1, x2, y2), got {len(first_pos)} values")
         
+        # Slot rectangles as an (N, 4) array for the occupancy kernel
+        self.slot_boxes = np.array(
+            [(x, y, x + w, y + h) for (x, y), (w, h) in zip(self.parking_positions, self.slot_dimensions)],
+            dtype=np.float64
+        ).reshape(-1, 4)
+        
         # Add legacy properties for backward compatibility
         self.slot_width = self.default_slot_width
         self.slot_height = self.default_slot_height
@@ -108,35 +119,16 @@ class ParkingManager:
         Returns:
             List of boolean values indicating occupancy for each parking slot
         """
-        occupancy = [False] * self.total_slots
-        slot_overlaps = [0.0] * self.total_slots  # Track max overlap for each slot
+        vehicle_boxes = np.array([vehicle[:4] for vehicle in vehicle_detections], dtype=np.float64)
+        slot_overlaps = slot_overlap_ratios(self.slot_boxes, vehicle_boxes)
         
-        for i, parking_slot in enumerate(self.parking_positions):
-            max_overlap = 0.0
-            best_vehicle = None
-            
-            # Get slot-specific dimensions
-            slot_w, slot_h = self.slot_dimensions[i]
-            
-            for j, vehicle in enumerate(vehicle_detections):
-                vehicle_box = vehicle[:4]  # (x1, y1, x2, y2)
-                overlap_ratio = calculate_box_overlap_with_slot(
-                    vehicle_box, parking_slot, slot_w, slot_h
-                )
-                
-                if overlap_ratio > max_overlap:
-                    max_overlap = overlap_ratio
-                    best_vehicle = j
-                
-                # If overlap exceeds threshold, mark as occupied
-                if overlap_ratio > self.occupancy_threshold:
-                    occupancy[i] = True
-                    break
-            
-            slot_overlaps[i] = max_overlap
-            
-            if CONFIG.debug and max_overlap > 0.1:
-                logger.debug(f"Slot {i+1}: overlap={max_overlap:.3f}, occupied={occupancy[i]}, size={slot_w}x{slot_h}")
+        # A slot is occupied when any single vehicle covers more than the threshold
+        occupancy = (slot_overlaps > self.occupancy_threshold).tolist()
+        
+        if CONFIG.debug:
+            for i in np.flatnonzero(slot_overlaps > 0.1):
+                slot_w, slot_h = self.slot_dimensions[i]
+                logger.debug(f"Slot {i+1}: overlap={slot_overlaps[i]:.3f}, occupied={occupancy[i]}, size={slot_w}x{slot_h}")
         
         # Update statistics
         occupied_count = sum(occupancy)
@@ -257,8 +249,8 @@ class ParkingManager:
         if len(self.occupancy_history) < window_size:
             return {"status": "insufficient_data", "frames_needed": window_size}
         
-        recent_occupancy = self.occupancy_history[-window_size:]
-        recent_detections = self.detection_history[-window_size:]
+        recent_occupancy = list(self.occupancy_history)[-window_size:]
+        recent_detections = list(self.detection_history)[-window_size:]
         
         analysis = {
             "window_size": window_size,
@@ -300,8 +292,8 @@ class ParkingManager:
             "total_slots": self.total_slots,
             "slot_dimensions": {"width": self.slot_width, "height": self.slot_height},
             "occupancy_threshold": self.occupancy_threshold,
-            "occupancy_history": self.occupancy_history.copy(),
-            "detection_history": self.detection_history.copy(),
+            "occupancy_history": list(self.occupancy_history),
+            "detection_history": list(self.detection_history),
             "total_frames_processed": len(self.occupancy_history)
         }
     
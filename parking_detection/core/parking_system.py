@@ -4,10 +4,12 @@ Main YOLOv8 Parking Detection System Application
 
 import cv2
 import logging
+import threading
 import time
 from datetime import datetime
 from typing import Optional, Callable
 import os
+import numpy as np
 
 from .vehicle_detector import VehicleDetector
 from .parking_manager import ParkingManager
@@ -37,7 +39,7 @@ class ParkingDetectionSystem:
         Args:
             model_path: Path to YOLOv8 model (optional)
             parking_positions_file: Path to parking positions file (optional)
-            parking_positions: List of (x, y) tuples for parking slot coordinates (optional)
+            parking_positions: List or ndarray of parking slot coordinates (optional)
         """
         logger.info("🚀 Initializing YOLOv8 Parking Detection System")
         
@@ -50,6 +52,7 @@ class ParkingDetectionSystem:
             parking_positions_file=parking_positions_file,
             parking_positions=parking_positions
         )
+        self._positions_key = self._make_positions_key(parking_positions)
         self.visualizer = ParkingVisualizer()
         
         # Video processing state
@@ -63,8 +66,48 @@ class ParkingDetectionSystem:
         self.fps_start_time = time.time()
         self.current_fps = 0.0
         
+        # Serializes use of an instance shared between request threads
+        self.lock = threading.RLock()
+        
         logger.info("✅ System initialization complete")
     
+    @staticmethod
+    def preload_model(model_path: Optional[str] = None) -> None:
+        """
+        Load the detector weights into the process-wide model cache
+        
+        Called before gunicorn forks so workers share the weights copy-on-write.
+        Weights stay on the CPU; each worker moves them to its device on first
+        inference, since CUDA contexts do not survive fork.
+        
+        Args:
+            model_path: Path to YOLOv8 model (uses config default if None)
+        """
+        VehicleDetector.preload(model_path)
+    
+    def update_positions(self, parking_positions: list) -> None:
+        """
+        Replace the parking slot layout without reloading the detector model
+        
+        Args:
+            parking_positions: List or (N, 4) ndarray of parking slot coordinates
+        """
+        positions_key = self._make_positions_key(parking_positions)
+        if positions_key is not None and positions_key == self._positions_key:
+            # Same layout as the last request for this camera
+            return
+        
+        self.parking_manager = ParkingManager(parking_positions=parking_positions)
+        self._positions_key = positions_key
+    
+    @staticmethod
+    def _make_positions_key(parking_positions) -> Optional[tuple]:
+        """Build a comparable key for a slot layout (None when loaded from file)"""
+        if parking_positions is None:
+            return None
+        positions = np.asarray(parking_positions, dtype=np.int64)
+        return positions.shape, positions.tobytes()
+    
     def load_video(self, video_path: str) -> bool:
         """
         Load video file for processing
@@ -150,10 +193,27 @@ class ParkingDetectionSystem:
         Returns:
             Tuple of (annotated_frame, occupancy_stats, processing_time)
         """
+        annotated_frame, statistics, processing_time, _, _ = self.process_frame_full(frame)
+        return annotated_frame, statistics, processing_time
+    
+    def process_frame_full(self, frame, vehicle_detections: Optional[list] = None) -> tuple:
+        """
+        Process a single frame and also return the raw detection results
+        
+        Args:
+            frame: Input video frame
+            vehicle_detections: Detections already computed for this frame
+                (e.g. by a DetectionBatcher); the detector runs if None
+            
+        Returns:
+            Tuple of (annotated_frame, occupancy_stats, processing_time,
+            vehicle_detections, occupancy)
+        """
         start_time = time.time()
         
         # Detect vehicles
-        vehicle_detections = self.vehicle_detector.detect_vehicles(frame)
+        if vehicle_detections is None:
+            vehicle_detections = self.vehicle_detector.detect_vehicles(frame)
         
         # Detect parking occupancy
         occupancy = self.parking_manager.detect_occupancy(vehicle_detections)
@@ -181,7 +241,7 @@ class ParkingDetectionSystem:
                 annotated_frame, self.current_fps, processing_time
             )
         
-        return annotated_frame, statistics, processing_time
+        return annotated_frame, statistics, processing_time, vehicle_detections, occupancy
     
     def process_video_to_file(self, 
                             input_video_path: str, 
@@ -232,7 +292,8 @@ class ParkingDetectionSystem:
                     self.processed_frames = frame_count
                     
                     # Process frame
-                    annotated_frame, statistics, _ = self.process_frame(frame)
+                    annotated_frame, statistics, _, vehicle_detections, _ = \
+                        self.process_frame_full(frame)
                     
                     # Write frame to output
                     self.video_writer.write(annotated_frame)
@@ -240,7 +301,7 @@ class ParkingDetectionSystem:
                     # Update statistics
                     total_occupied += statistics.get('occupied_slots', 0)
                     total_empty += statistics.get('empty_slots', 0)
-                    total_vehicles += len(self.vehicle_detector.detect_vehicles(frame))
+                    total_vehicles += len(vehicle_detections)
                     
                     # Progress reporting
                     if frame_count % 50 == 0 or frame_count == self.total_frames:
@@ -297,7 +358,8 @@ class ParkingDetectionSystem:
                     self.processed_frames = frame_count
                     
                     # Process frame
-                    annotated_frame, statistics, _ = self.process_frame(frame)
+                    annotated_frame, statistics, _, vehicle_detections, _ = \
+                        self.process_frame_full(frame)
                 
                 # Display frame
                 cv2.imshow(display_window_name, annotated_frame)
@@ -323,7 +385,7 @@ class ParkingDetectionSystem:
                     occupied = statistics.get('occupied_slots', 0)
                     total_slots = statistics.get('total_slots', 0)
                     occupancy_rate = statistics.get('occupancy_rate', 0.0)
-                    vehicle_count = len(self.vehicle_detector.detect_vehicles(frame))
+                    vehicle_count = len(vehicle_detections)
                     
                     logger.info(f"Frame {frame_count}: {occupied}/{total_slots} occupied "
                               f"({occupancy_rate:.1f}%), {vehicle_count} vehicles detected")
@@ -372,7 +434,8 @@ class ParkingDetectionSystem:
                     self.processed_frames = frame_count
                     
                     # Process frame
-                    annotated_frame, statistics, _ = self.process_frame(frame)
+                    annotated_frame, statistics, _, vehicle_detections, _ = \
+                        self.process_frame_full(frame)
                     
                     # Record if enabled
                     if recording and video_writer is not None:
@@ -417,7 +480,7 @@ class ParkingDetectionSystem:
                     occupied = statistics.get('occupied_slots', 0)
                     total_slots = statistics.get('total_slots', 0)
                     occupancy_rate = statistics.get('occupancy_rate', 0.0)
-                    vehicle_count = len(self.vehicle_detector.detect_vehicles(frame))
+                    vehicle_count = len(vehicle_detections)
                     
                     logger.info(f"Frame {frame_count}: {occupied}/{total_slots} occupied "
                               f"({occupancy_rate:.1f}%), {vehicle_count} vehicles detected")
@@ -453,8 +516,9 @@ class ParkingDetectionSystem:
         logger.info(f"🖼️ Processing image: {image_path}")
         logger.info(f"   Dimensions: {frame.shape[1]}x{frame.shape[0]}")
         
-        # Process frame
-        annotated_frame, statistics, processing_time = self.process_frame(frame)
+        # Process frame (detections and occupancy are reused for the log below)
+        annotated_frame, statistics, processing_time, vehicle_detections, occupancy = \
+            self.process_frame_full(frame)
         
         # Generate output path if not provided
         if output_path is None:
@@ -467,13 +531,8 @@ class ParkingDetectionSystem:
         # Save result
         cv2.imwrite(output_path, annotated_frame)
         
-        # Get vehicle detections for detailed logging
-        vehicle_detections = self.vehicle_detector.detect_vehicles(frame)
         total_cars_detected = len(vehicle_detections)
         
-        # Get occupancy information
-        occupancy = self.parking_manager.detect_occupancy(vehicle_detections)
-        
         # Log results
         logger.info("="*60)
         logger.info("📊 SINGLE IMAGE PROCESSING COMPLETED")
@@ -4,8 +4,9 @@ Vehicle detection module using YOLOv8
 
 import cv2
 import numpy as np
+import threading
 from ultralytics import YOLO
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 
 from ..config.settings import CONFIG
@@ -16,6 +17,12 @@ logger = logging.getLogger(__name__)
 class VehicleDetector:
     """YOLOv8-based vehicle detection system"""
     
+    # Loaded models are shared by every detector using the same weights, so
+    # creating a detector per camera/request does not reload them from disk
+    _models: Dict[str, YOLO] = {}
+    _inference_locks: Dict[str, threading.Lock] = {}
+    _models_lock = threading.Lock()
+    
     def __init__(self, model_path: Optional[str] = None, 
                  confidence_threshold: Optional[float] = None,
                  device: Optional[str] = None):
@@ -33,13 +40,16 @@ class VehicleDetector:
         
         logger.info(f"Initializing VehicleDetector with model: {self.model_path}")
         
-        # Load YOLOv8 model
-        try:
-            self.model = YOLO(self.model_path)
-            logger.info(f"✅ YOLOv8 model loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load YOLOv8 model: {e}")
-            raise
+        # Load YOLOv8 model (or reuse an already loaded one)
+        self.model, self._inference_lock = self._load_model(self.model_path)
+        
+        # Arguments for every inference call; FP16 halves memory traffic on CUDA
+        self._predict_kwargs = {'conf': self.confidence_threshold, 'verbose': False}
+        if self.device != 'auto':
+            self._predict_kwargs['device'] = self.device
+        if CONFIG.model.half_precision and self._uses_cuda():
+            self._predict_kwargs['half'] = True
+            logger.info("Using FP16 inference on CUDA")
         
         # Vehicle class IDs (COCO dataset)
         self.vehicle_class_ids = {
@@ -53,6 +63,50 @@ class VehicleDetector:
         # Primary focus on cars for parking detection
         self.primary_vehicle_classes = [0]  # Car only for better accuracy
         
+    @classmethod
+    def _load_model(cls, model_path: str) -> Tuple[YOLO, threading.Lock]:
+        """
+        Load a YOLOv8 model once per process
+        
+        Args:
+            model_path: Path to YOLOv8 model
+            
+        Returns:
+            Tuple of (model, inference lock shared by all users of the model)
+        """
+        with cls._models_lock:
+            model = cls._models.get(model_path)
+            if model is None:
+                try:
+                    model = YOLO(model_path)
+                    logger.info(f"✅ YOLOv8 model loaded successfully")
+                except Exception as e:
+                    logger.error(f"❌ Failed to load YOLOv8 model: {e}")
+                    raise
+                cls._models[model_path] = model
+                cls._inference_locks[model_path] = threading.Lock()
+            return model, cls._inference_locks[model_path]
+    
+    def _uses_cuda(self) -> bool:
+        """Check whether inference will run on a CUDA device"""
+        if self.device == 'cpu':
+            return False
+        try:
+            import torch
+            return torch.cuda.is_available()
+        except ImportError:
+            return False
+    
+    @classmethod
+    def preload(cls, model_path: Optional[str] = None) -> None:
+        """
+        Load model weights ahead of the first detection
+        
+        Args:
+            model_path: Path to YOLOv8 model (uses config default if None)
+        """
+        cls._load_model(model_path or CONFIG.model.model_path)
+    
     def detect_vehicles(self, frame: np.ndarray, 
                        include_all_vehicles: bool = False) -> List[Tuple[int, int, int, int, float, str]]:
         """
@@ -70,29 +124,13 @@ class VehicleDetector:
             timer.__enter__()
         
         try:
-            # Run YOLOv8 inference
-            results = self.model(frame, conf=self.confidence_threshold, verbose=False)
+            # Run YOLOv8 inference (ultralytics predictors are not thread-safe)
+            with self._inference_lock:
+                results = self.model(frame, **self._predict_kwargs)
             
             detections = []
             for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Extract box data
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
-                        
-                        # Filter for vehicles
-                        if class_id in self.vehicle_class_ids:
-                            class_name = self.vehicle_class_ids[class_id]
-                            
-                            # Apply vehicle type filtering
-                            if include_all_vehicles or class_id in self.primary_vehicle_classes:
-                                detections.append((
-                                    int(x1), int(y1), int(x2), int(y2), 
-                                    confidence, class_name
-                                ))
+                detections.extend(self._extract_detections(result, include_all_vehicles))
             
             if CONFIG.debug:
                 logger.debug(f"Detected {len(detections)} vehicles")
@@ -104,6 +142,64 @@ class VehicleDetector:
             logger.error(f"Error during vehicle detection: {e}")
             return []
     
+    def detect_vehicles_batch(self, frames: List[np.ndarray],
+                              include_all_vehicles: bool = False) -> List[List[Tuple[int, int, int, int, float, str]]]:
+        """
+        Detect vehicles in several frames with a single forward pass
+        
+        Args:
+            frames: Input image frames (sizes may differ)
+            include_all_vehicles: If True, detect all vehicle types; if False, cars only
+            
+        Returns:
+            One detection list per input frame, in input order
+        """
+        if not frames:
+            return []
+        
+        try:
+            with self._inference_lock:
+                results = self.model(list(frames), **self._predict_kwargs)
+            
+            return [self._extract_detections(result, include_all_vehicles) for result in results]
+            
+        except Exception as e:
+            logger.error(f"Error during batched vehicle detection: {e}")
+            return [[] for _ in frames]
+    
+    def _extract_detections(self, result,
+                            include_all_vehicles: bool) -> List[Tuple[int, int, int, int, float, str]]:
+        """
+        Convert one ultralytics result into detection tuples
+        
+        Args:
+            result: Result for a single image
+            include_all_vehicles: If True, keep all vehicle types; if False, cars only
+            
+        Returns:
+            List of detections: [(x1, y1, x2, y2, confidence, class_name), ...]
+        """
+        detections = []
+        boxes = result.boxes
+        if boxes is not None:
+            for box in boxes:
+                # Extract box data
+                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                confidence = float(box.conf[0].cpu().numpy())
+                class_id = int(box.cls[0].cpu().numpy())
+                
+                # Filter for vehicles
+                if class_id in self.vehicle_class_ids:
+                    class_name = self.vehicle_class_ids[class_id]
+                    
+                    # Apply vehicle type filtering
+                    if include_all_vehicles or class_id in self.primary_vehicle_classes:
+                        detections.append((
+                            int(x1), int(y1), int(x2), int(y2), 
+                            confidence, class_name
+                        ))
+        return detections
+    
     def get_detection_stats(self, detections: List[Tuple[int, int, int, int, float, str]]) -> dict:
         """
         Get statistics about detections
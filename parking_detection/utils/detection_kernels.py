@@ -0,0 +1,78 @@
+"""
+Vectorized kernels for slot occupancy detection
+"""
+
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _slot_overlap_ratios_numpy(slot_boxes: np.ndarray, vehicle_boxes: np.ndarray) -> np.ndarray:
+    """Broadcast (N, M) implementation used when Numba is not installed"""
+    slots = slot_boxes[:, None, :]
+    vehicles = vehicle_boxes[None, :, :]
+    
+    # Pairwise intersection of every slot with every vehicle
+    inter_w = np.minimum(vehicles[..., 2], slots[..., 2]) - np.maximum(vehicles[..., 0], slots[..., 0])
+    inter_h = np.minimum(vehicles[..., 3], slots[..., 3]) - np.maximum(vehicles[..., 1], slots[..., 1])
+    intersections = np.where((inter_w > 0) & (inter_h > 0), inter_w * inter_h, 0.0)
+    
+    slot_areas = (slot_boxes[:, 2] - slot_boxes[:, 0]) * (slot_boxes[:, 3] - slot_boxes[:, 1])
+    best = intersections.max(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(slot_areas > 0, best / slot_areas, 0.0)
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _slot_overlap_ratios_numba(slot_boxes, vehicle_boxes):
+        n_slots = slot_boxes.shape[0]
+        n_vehicles = vehicle_boxes.shape[0]
+        overlaps = np.zeros(n_slots, dtype=np.float64)
+        
+        for i in range(n_slots):
+            sx1 = slot_boxes[i, 0]
+            sy1 = slot_boxes[i, 1]
+            sx2 = slot_boxes[i, 2]
+            sy2 = slot_boxes[i, 3]
+            slot_area = (sx2 - sx1) * (sy2 - sy1)
+            if slot_area <= 0:
+                continue
+            
+            best = 0.0
+            for j in range(n_vehicles):
+                inter_w = min(vehicle_boxes[j, 2], sx2) - max(vehicle_boxes[j, 0], sx1)
+                inter_h = min(vehicle_boxes[j, 3], sy2) - max(vehicle_boxes[j, 1], sy1)
+                if inter_w > 0 and inter_h > 0:
+                    ratio = inter_w * inter_h / slot_area
+                    if ratio > best:
+                        best = ratio
+            overlaps[i] = best
+        
+        return overlaps
+
+
+def slot_overlap_ratios(slot_boxes: np.ndarray, vehicle_boxes: np.ndarray) -> np.ndarray:
+    """
+    Compute, for every slot, the largest fraction of its area covered by a single vehicle
+    
+    Args:
+        slot_boxes: (N, 4) array of slot rectangles (x1, y1, x2, y2)
+        vehicle_boxes: (M, 4) array of vehicle boxes (x1, y1, x2, y2)
+        
+    Returns:
+        (N,) float64 array of overlap ratios in [0, 1]
+    """
+    slot_boxes = np.ascontiguousarray(slot_boxes, dtype=np.float64).reshape(-1, 4)
+    vehicle_boxes = np.ascontiguousarray(vehicle_boxes, dtype=np.float64).reshape(-1, 4)
+    
+    if slot_boxes.shape[0] == 0 or vehicle_boxes.shape[0] == 0:
+        return np.zeros(slot_boxes.shape[0], dtype=np.float64)
+    
+    if NUMBA_AVAILABLE:
+        return _slot_overlap_ratios_numba(slot_boxes, vehicle_boxes)
+    return _slot_overlap_ratios_numpy(slot_boxes, vehicle_boxes)
@@ -9,11 +9,18 @@ Run: python setup_indexes.py
 """
 
 from config.database import db
+from pymongo.errors import OperationFailure
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Left-prefix duplicates of the parking_data compound indexes; every parking
+# update pays for each index, so they are dropped here
+OBSOLETE_PARKING_INDEXES = ('user_id_1', 'camera_id_1', 'timestamp_-1', 'user_id_1_camera_id_1')
+# MongoDB error code for dropping an index that no longer exists
+INDEX_NOT_FOUND = 27
+
 
 def setup_indexes():
     """Create indexes for api_credentials collection"""
@@ -128,10 +135,10 @@ def setup_parking_data_indexes():
         collection.create_index([('user_id', 1), ('timestamp', -1)])
         print("   ✅ Index created: user_id + timestamp")
 
-        # Index on camera_id
-        print("\n2. Creating index on 'camera_id'...")
-        collection.create_index('camera_id')
-        print("   ✅ Index created: camera_id")
+        # Compound index on camera_id + timestamp
+        print("\n2. Creating compound index on 'camera_id' + 'timestamp'...")
+        collection.create_index([('camera_id', 1), ('timestamp', -1)])
+        print("   ✅ Index created: camera_id + timestamp")
 
         # Compound index on user_id + camera_id + timestamp
         print("\n3. Creating compound index on 'user_id' + 'camera_id' + 'timestamp'...")
@@ -139,6 +146,16 @@ def setup_parking_data_indexes():
             [('user_id', 1), ('camera_id', 1), ('timestamp', -1)])
         print("   ✅ Index created: user_id + camera_id + timestamp")
 
+        # Drop indexes made redundant by the compound ones above
+        print("\n4. Dropping redundant single-field indexes...")
+        for name in OBSOLETE_PARKING_INDEXES:
+            try:
+                collection.drop_index(name)
+                print(f"   ✅ Index dropped: {name}")
+            except OperationFailure as e:
+                if e.code != INDEX_NOT_FOUND:
+                    raise
+
         print("\n✅ Parking data indexes verified/created!")
 
         return True
@@ -5,6 +5,8 @@ Organizes images by user_id/node_id/timestamp structure
 
 import os
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Tuple
 import cv2
@@ -21,6 +23,9 @@ class GCSStorageManager:
     def __init__(self):
         """Initialize GCS client"""
         self.enabled = os.getenv('GCS_ENABLE', 'true').lower() == 'true'
+        self.upload_workers = int(os.getenv('GCS_UPLOAD_WORKERS', 8))
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
         if not self.enabled:
             logger.info("GCS storage is disabled")
@@ -83,58 +88,24 @@ class GCSStorageManager:
         if timestamp is None:
             timestamp = datetime.utcnow()
 
+        # Encode image to JPEG
         try:
-            # Create hierarchical path: user_id/node_id/YYYY/MM/DD/image_timestamp.jpg
-            blob_path = self._generate_blob_path(
-                user_id, node_id, timestamp, image_type)
-
-            # Encode image to JPEG
             success, buffer = cv2.imencode(
                 '.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
-            if not success:
-                logger.error("Failed to encode image to JPEG")
-                return None
-
-            image_bytes = buffer.tobytes()
-
-            # Upload to GCS
-            blob = self.bucket.blob(blob_path)
-            blob.upload_from_string(
-                image_bytes,
-                content_type='image/jpeg'
-            )
-
-            # Set metadata
-            blob.metadata = {
-                'user_id': user_id,
-                'node_id': node_id,
-                'image_type': image_type,
-                'upload_timestamp': datetime.utcnow().isoformat(),
-                'capture_timestamp': timestamp.isoformat()
-            }
-            blob.patch()
-
-            # Try to make blob publicly readable (works if bucket allows public access)
-            try:
-                blob.make_public()
-                public_url = blob.public_url
-                logger.debug(f"✅ Image made public: {blob_path}")
-            except Exception as e:
-                # If public access fails, generate a signed URL (works with private buckets)
-                logger.debug(
-                    f"⚠️ Could not make public, using signed URL: {e}")
-                from datetime import timedelta
-                public_url = blob.generate_signed_url(
-                    expiration=timedelta(days=7),  # 7 days expiration
-                    method='GET'
-                )
-
-            logger.info(f"✅ Image uploaded to GCS: {blob_path}")
-            return blob_path, public_url
-
         except Exception as e:
-            logger.error(f"❌ Failed to upload image to GCS: {e}")
+            logger.error(f"❌ Failed to encode image for GCS upload: {e}")
             return None
+        if not success:
+            logger.error("Failed to encode image to JPEG")
+            return None
+
+        return self.upload_image_bytes(
+            image_bytes=buffer.tobytes(),
+            user_id=user_id,
+            node_id=node_id,
+            timestamp=timestamp,
+            image_type=image_type
+        )
 
     def upload_image_bytes(
         self,
@@ -149,7 +120,7 @@ class GCSStorageManager:
         Upload image bytes directly to Google Cloud Storage
 
         Args:
-            image_bytes: Image as bytes
+            image_bytes: Image as bytes or a bytes-like buffer
             user_id: User ID
             node_id: Node/Camera ID
             timestamp: Timestamp
@@ -170,12 +141,12 @@ class GCSStorageManager:
             blob_path = self._generate_blob_path(
                 user_id, node_id, timestamp, image_type)
 
-            blob = self.bucket.blob(blob_path)
-            blob.upload_from_string(
-                image_bytes,
-                content_type=content_type
-            )
+            # upload_from_string only accepts real bytes
+            if not isinstance(image_bytes, bytes):
+                image_bytes = bytes(image_bytes)
 
+            # Metadata set before the upload is sent with it, so no patch() round trip
+            blob = self.bucket.blob(blob_path)
             blob.metadata = {
                 'user_id': user_id,
                 'node_id': node_id,
@@ -183,7 +154,10 @@ class GCSStorageManager:
                 'upload_timestamp': datetime.utcnow().isoformat(),
                 'capture_timestamp': timestamp.isoformat()
             }
-            blob.patch()
+            blob.upload_from_string(
+                image_bytes,
+                content_type=content_type
+            )
 
             # Try to make blob publicly readable (works if bucket allows public access)
             try:
@@ -200,13 +174,40 @@ class GCSStorageManager:
                     method='GET'
                 )
 
-            logger.info(f"✅ Image bytes uploaded to GCS: {blob_path}")
+            logger.info(f"✅ Image uploaded to GCS: {blob_path}")
             return blob_path, public_url
 
         except Exception as e:
             logger.error(f"❌ Failed to upload image bytes to GCS: {e}")
             return None
 
+    def upload_image_async(self, **kwargs) -> Future:
+        """
+        Run upload_image on the upload pool so it overlaps with other work
+
+        Returns:
+            Future resolving to upload_image's result
+        """
+        return self._get_executor().submit(self.upload_image, **kwargs)
+
+    def upload_image_bytes_async(self, **kwargs) -> Future:
+        """
+        Run upload_image_bytes on the upload pool so it overlaps with other work
+
+        Returns:
+            Future resolving to upload_image_bytes's result
+        """
+        return self._get_executor().submit(self.upload_image_bytes, **kwargs)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so each gunicorn worker gets its own threads
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.upload_workers, thread_name_prefix='gcs-upload')
+        return self._executor
+
     def _generate_blob_path(
         self,
         user_id: str,
@@ -3,19 +3,88 @@ Image utilities for decoding and processing images
 """
 
 import base64
+import gzip
+import io
 import logging
+import math
+import mmap
+import os
+import zlib
 import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+    _ZSTD_ERRORS = (zstandard.ZstdError,)
+except ImportError:
+    ZSTD_AVAILABLE = False
+    _ZSTD_ERRORS = ()
+
+# Opt-in NVJPEG decoding on the GPU for JPEG uploads (falls back to OpenCV)
+_GPU_JPEG_DECODE = os.getenv('GPU_JPEG_DECODE', 'false').lower() == 'true'
+_gpu_decoder = None
+
+
+def _get_gpu_decoder():
+    """Resolve torchvision's decode_jpeg on first use (after fork), or False if unusable"""
+    global _gpu_decoder
+    if _gpu_decoder is None:
+        try:
+            import torch
+            from torchvision.io import ImageReadMode, decode_jpeg
+            if not torch.cuda.is_available():
+                raise RuntimeError("CUDA not available")
+            _gpu_decoder = (torch, decode_jpeg, ImageReadMode.RGB)
+            logger.info("✅ Using GPU JPEG decoding")
+        except Exception as e:
+            logger.warning(f"⚠️  GPU JPEG decoding unavailable, using OpenCV: {e}")
+            _gpu_decoder = False
+    return _gpu_decoder
+
+
+def _decode_jpeg_gpu(nparr: np.ndarray):
+    """
+    Decode a JPEG with NVJPEG
+    
+    Args:
+        nparr: Encoded JPEG bytes as a uint8 array
+    
+    Returns:
+        BGR OpenCV image, or None if the data is not a JPEG or decoding failed
+    """
+    decoder = _get_gpu_decoder()
+    if not decoder or nparr[:2].tobytes() != b'\xff\xd8':
+        return None
+    
+    torch, decode_jpeg, rgb = decoder
+    try:
+        data = torch.from_numpy(nparr.copy())
+        rgb_chw = decode_jpeg(data, mode=rgb, device='cuda', apply_exif_orientation=True)
+        # CHW RGB -> HWC BGR on the device, then one copy back for OpenCV
+        return rgb_chw.permute(1, 2, 0).flip(-1).contiguous().cpu().numpy()
+    except Exception as e:
+        logger.debug(f"GPU JPEG decode failed, using OpenCV: {e}")
+        return None
+
+
+def _imdecode(nparr: np.ndarray):
+    """Decode encoded image bytes to a BGR image, on the GPU when enabled"""
+    if _GPU_JPEG_DECODE:
+        image = _decode_jpeg_gpu(nparr)
+        if image is not None:
+            return image
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
 
 def decode_image(image_data):
     """
     Decode image from base64 string or bytes
     
     Args:
-        image_data: Base64 string, data URL, or bytes
+        image_data: Base64 string, data URL, bytes or bytes-like buffer
     
     Returns:
         OpenCV image (numpy array)
@@ -25,19 +94,13 @@ def decode_image(image_data):
     """
     try:
         if isinstance(image_data, str):
-            # Remove data URL prefix if present
-            if image_data.startswith('data:image'):
-                image_data = image_data.split(',')[1]
-            
-            # Decode base64
-            image_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            nparr = np.frombuffer(decode_base64_image(image_data), np.uint8)
+            image = _imdecode(nparr)
             
-        elif isinstance(image_data, bytes):
-            # Direct bytes
+        elif isinstance(image_data, (bytes, bytearray, memoryview, mmap.mmap)):
+            # Direct bytes or a zero-copy buffer over an upload
             nparr = np.frombuffer(image_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            image = _imdecode(nparr)
             
         else:
             raise ValueError("Unsupported image format. Expected base64 string or bytes")
@@ -52,6 +115,93 @@ def decode_image(image_data):
         raise ValueError(f"Image decoding failed: {str(e)}")
 
 
+def decode_base64_image(image_data: str) -> bytes:
+    """
+    Decode a base64 image (optionally a data URL) to its encoded bytes
+    
+    Args:
+        image_data: Base64 string or data URL
+    
+    Returns:
+        Encoded image bytes (e.g. JPEG), suitable for decode_image or upload
+    """
+    # Remove data URL prefix if present
+    if image_data.startswith('data:image'):
+        image_data = image_data.split(',', 1)[1]
+    
+    return base64.b64decode(image_data)
+
+
+def read_upload_buffer(file_storage):
+    """
+    Get the contents of an uploaded file, mapping uploads spooled to disk instead of reading them
+
+    Args:
+        file_storage: Werkzeug FileStorage or file-like object
+
+    Returns:
+        mmap over uploads already on disk, bytes otherwise
+    """
+    stream = getattr(file_storage, 'stream', file_storage)
+
+    # Werkzeug spools uploads in a SpooledTemporaryFile, which stays in memory
+    # until it outgrows its threshold. Its fileno() forces a rollover to disk,
+    # so only map spools that have already rolled over.
+    if hasattr(stream, '_rolled'):
+        if not stream._rolled:
+            return stream.read()
+        stream = stream._file
+
+    try:
+        fileno = stream.fileno()
+        if os.fstat(fileno).st_size > 0:
+            return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        pass
+
+    return stream.read()
+
+
+def decompress_body(data, content_encoding: str, max_size: int) -> bytes:
+    """
+    Undo the Content-Encoding of an uploaded request body
+
+    Args:
+        data: Request body as received
+        content_encoding: Value of the Content-Encoding header
+        max_size: Largest decompressed size accepted, in bytes
+
+    Returns:
+        Decompressed body
+
+    Raises:
+        ValueError: If the encoding is unsupported, the body is corrupt or
+            it expands beyond max_size
+    """
+    encoding = content_encoding.strip().lower()
+    if encoding in ('', 'identity'):
+        return data
+
+    try:
+        if encoding == 'zstd' and ZSTD_AVAILABLE:
+            reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+        elif encoding == 'gzip':
+            reader = gzip.GzipFile(fileobj=io.BytesIO(data))
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+
+        # Read one byte past the limit so oversized bodies are detected
+        # without inflating all of them
+        with reader:
+            body = reader.read(max_size + 1)
+    except (OSError, EOFError, zlib.error, *_ZSTD_ERRORS) as e:
+        raise ValueError(f"Corrupt {encoding} body: {e}")
+
+    if len(body) > max_size:
+        raise ValueError(f"Decompressed body exceeds {max_size} bytes")
+    return body
+
+
 def encode_image_to_base64(image, format='.jpg', quality=90) -> str:
     """
     Encode OpenCV image to base64 string
@@ -80,7 +230,11 @@ def encode_image_to_base64(image, format='.jpg', quality=90) -> str:
         raise ValueError(f"Image encoding failed: {str(e)}")
 
 
-def validate_coordinates(coordinates) -> bool:
+# Largest coordinate magnitude that survives the int32 cast
+_COORDINATE_MAX = np.iinfo(np.int32).max
+
+
+def validate_coordinates(coordinates) -> np.ndarray:
     """
     Validate parking slot coordinates format
     
@@ -88,7 +242,8 @@ def validate_coordinates(coordinates) -> bool:
         coordinates: List of coordinate arrays
     
     Returns:
-        True if valid, raises ValueError if invalid
+        (N, 4) int32 array of [x1, y1, x2, y2] rows (fractional values rounded
+        to the nearest pixel); raises ValueError if invalid
     """
     if not isinstance(coordinates, list):
         raise ValueError("Coordinates must be a list")
@@ -96,6 +251,27 @@ def validate_coordinates(coordinates) -> bool:
     if len(coordinates) == 0:
         raise ValueError("Coordinates list cannot be empty")
     
+    # Validate all rows in one vectorized pass; the per-item walk below only
+    # runs to produce a precise error message
+    try:
+        rects = np.asarray(coordinates, dtype=np.float64)
+    except (TypeError, ValueError):
+        rects = None
+    
+    # Fractional pixels are rounded, and ordering is checked after rounding,
+    # so [10.2, 5, 10.8, 9] can't become a zero-width slot; values that
+    # don't fit int32 (including inf/nan) are rejected before the cast
+    if (rects is not None and rects.ndim == 2 and rects.shape[1] == 4
+            and np.isfinite(rects).all() and (np.abs(rects) <= _COORDINATE_MAX).all()):
+        rects = np.rint(rects).astype(np.int32)
+        if (rects[:, 2] > rects[:, 0]).all() and (rects[:, 3] > rects[:, 1]).all():
+            return rects
+    
+    _raise_coordinate_error(coordinates)
+
+
+def _raise_coordinate_error(coordinates) -> None:
+    """Find the first invalid coordinate and raise a ValueError describing it"""
     for i, coord in enumerate(coordinates):
         if not isinstance(coord, (list, tuple)):
             raise ValueError(f"Coordinate {i} must be a list or tuple")
@@ -103,7 +279,16 @@ def validate_coordinates(coordinates) -> bool:
         if len(coord) != 4:
             raise ValueError(f"Coordinate {i} must have 4 values [x1, y1, x2, y2], got {len(coord)}")
         
-        x1, y1, x2, y2 = coord
+        try:
+            values = [float(value) for value in coord]
+        except (TypeError, ValueError):
+            raise ValueError(f"Coordinate {i} values must be numbers")
+        
+        if not all(math.isfinite(value) and abs(value) <= _COORDINATE_MAX for value in values):
+            raise ValueError(f"Coordinate {i} values must be finite and within ±{_COORDINATE_MAX}")
+        
+        # Same rounding as np.rint (half to even)
+        x1, y1, x2, y2 = (round(value) for value in values)
         
         if x2 <= x1:
             raise ValueError(f"Coordinate {i}: x2 must be greater than x1")
@@ -111,7 +296,7 @@ def validate_coordinates(coordinates) -> bool:
         if y2 <= y1:
             raise ValueError(f"Coordinate {i}: y2 must be greater than y1")
     
-    return True
+    raise ValueError("Invalid coordinates")
 
 
 def get_image_dimensions(image) -> dict:
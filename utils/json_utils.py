@@ -0,0 +1,113 @@
+"""
+JSON helpers backed by orjson when it is installed
+"""
+
+import json
+from datetime import date, datetime
+import numpy as np
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj):
+    """Serialize the types orjson handles natively when falling back to json"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data):
+    """
+    Parse a JSON document
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON
+
+    Args:
+        obj: Object to serialize (datetimes and NumPy values are supported)
+
+    Returns:
+        JSON document as bytes
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(obj, status: int = 200) -> Response:
+    """
+    Build a JSON response without going through Flask's stdlib-based jsonify
+
+    Args:
+        obj: Response payload
+        status: HTTP status code
+
+    Returns:
+        Flask Response with an application/json body
+    """
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+class OrJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes and decodes with orjson
+
+    Output matches Flask's default provider (dates as HTTP dates, sorted keys
+    unless sort_keys is turned off) so jsonify and request.get_json keep their
+    behavior while running at orjson speed.
+    """
+
+    def _options(self, indent: bool = False) -> int:
+        options = _ORJSON_OPTIONS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    @staticmethod
+    def _orjson_default(obj):
+        # Flask's conversions first (dates, Decimal, UUID, __html__), then NumPy
+        try:
+            return DefaultJSONProvider.default(obj)
+        except TypeError:
+            return _default(obj)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self._orjson_default,
+                            option=self._options(bool(kwargs.get('indent')))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self._orjson_default, option=self._options(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
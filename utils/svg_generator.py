@@ -2,10 +2,45 @@
 SVG Generator for parking slot visualization
 """
 
-from typing import List, Tuple
+from typing import List, Sequence, Tuple, Union
+import numpy as np
 
+# Slot rectangles: an (N, 4) int array or a list of (x1, y1, x2, y2) tuples
+Rectangles = Union[np.ndarray, Sequence[Tuple[int, int, int, int]]]
 
-def generate_svg(parking_rectangles: List[Tuple[int, int, int, int]],
+# Fill/stroke attributes and status label by occupancy (red = occupied, green = empty)
+_SLOT_STYLES = {
+    True: ('fill="rgba(255, 0, 0, 0.3)" stroke="#FF0000"', 'Occupied'),
+    False: ('fill="rgba(0, 255, 0, 0.3)" stroke="#00FF00"', 'Empty')
+}
+
+_TEXT_STYLE = (
+    'font-weight="bold" fill="white" text-anchor="middle" '
+    'dominant-baseline="middle" stroke="black" stroke-width="1"'
+)
+
+# One %-template per occupancy state (rectangle + slot number) with the
+# constant attributes baked in; filled with
+# (x1, y1, width, height, slot, text_x, text_y, font_size, slot)
+_SLOT_TEMPLATES = {
+    occupied: (
+        '<rect x="%d" y="%d" width="%d" height="%d" '
+        f'{colors} stroke-width="3" data-slot="%d" data-status="{status}"/>'
+        '<text x="%d" y="%d" font-family="Arial, sans-serif" '
+        f'font-size="%d" {_TEXT_STYLE}>%d</text>'
+    )
+    for occupied, (colors, status) in _SLOT_STYLES.items()
+}
+
+
+def _slot_geometry(parking_rectangles: Rectangles) -> np.ndarray:
+    """Compute x1, y1, x2, y2, width, height for all slots at once as an (N, 6) int array"""
+    rects = np.asarray(parking_rectangles, dtype=np.int64).reshape(-1, 4)
+    sizes = rects[:, 2:] - rects[:, :2]
+    return np.hstack((rects, sizes))
+
+
+def generate_svg(parking_rectangles: Rectangles,
                 occupancy: List[bool],
                 image_width: int,
                 image_height: int) -> str:
@@ -13,7 +48,7 @@ def generate_svg(parking_rectangles: List[Tuple[int, int, int, int]],
     Generate SVG visualization of parking slots
     
     Args:
-        parking_rectangles: List of (x1, y1, x2, y2) tuples
+        parking_rectangles: (N, 4) array or list of (x1, y1, x2, y2) tuples
         occupancy: List of boolean values (True = occupied, False = empty)
         image_width: Image width in pixels
         image_height: Image height in pixels
@@ -21,57 +56,38 @@ def generate_svg(parking_rectangles: List[Tuple[int, int, int, int]],
     Returns:
         SVG code as string
     """
-    svg_parts = []
+    svg_parts = [
+        f'<svg width="{image_width}" height="{image_height}" xmlns="http://www.w3.org/2000/svg">',
+        f'<rect width="{image_width}" height="{image_height}" fill="none"/>'
+    ]
     
-    # SVG header
-    svg_parts.append(f'<svg width="{image_width}" height="{image_height}" xmlns="http://www.w3.org/2000/svg">')
-    svg_parts.append(f'<rect width="{image_width}" height="{image_height}" fill="none"/>')
+    # Slot number is centered with a font scaled to the slot size; all slots
+    # are computed in one vectorized pass and converted to plain ints
+    geometry = _slot_geometry(parking_rectangles)
+    sizes = geometry[:, 4:]
+    centers = geometry[:, :2] + sizes // 2
+    font_sizes = np.clip(sizes.min(axis=1) // 3, 12, 24)
+    slots = np.column_stack((geometry[:, :2], sizes, centers, font_sizes)).tolist()
     
-    # Draw each parking slot
-    for i, (rect, is_occupied) in enumerate(zip(parking_rectangles, occupancy), 1):
-        x1, y1, x2, y2 = rect
-        width = x2 - x1
-        height = y2 - y1
-        
-        # Choose color based on occupancy
-        if is_occupied:
-            fill_color = "rgba(255, 0, 0, 0.3)"  # Red with transparency
-            stroke_color = "#FF0000"
-            status = "Occupied"
-        else:
-            fill_color = "rgba(0, 255, 0, 0.3)"  # Green with transparency
-            stroke_color = "#00FF00"
-            status = "Empty"
-        
-        # Draw rectangle
-        svg_parts.append(f'<rect x="{x1}" y="{y1}" width="{width}" height="{height}" ')
-        svg_parts.append(f'fill="{fill_color}" stroke="{stroke_color}" stroke-width="3" ')
-        svg_parts.append(f'data-slot="{i}" data-status="{status}"/>')
-        
-        # Add slot number text
-        text_x = x1 + width // 2
-        text_y = y1 + height // 2
-        font_size = min(width, height) // 3
-        font_size = max(12, min(font_size, 24))
-        
-        svg_parts.append(f'<text x="{text_x}" y="{text_y}" ')
-        svg_parts.append(f'font-family="Arial, sans-serif" font-size="{font_size}" ')
-        svg_parts.append(f'font-weight="bold" fill="white" text-anchor="middle" ')
-        svg_parts.append(f'dominant-baseline="middle" ')
-        svg_parts.append(f'stroke="black" stroke-width="1">{i}</text>')
+    # Draw each parking slot (rectangle + slot number) as a single fragment
+    svg_parts.extend(
+        _SLOT_TEMPLATES[bool(is_occupied)] % (x1, y1, width, height, i, text_x, text_y, font_size, i)
+        for i, ((x1, y1, width, height, text_x, text_y, font_size), is_occupied)
+        in enumerate(zip(slots, occupancy), 1)
+    )
     
     svg_parts.append('</svg>')
     
     return ''.join(svg_parts)
 
 
-def generate_slot_details(parking_rectangles: List[Tuple[int, int, int, int]],
+def generate_slot_details(parking_rectangles: Rectangles,
                          occupancy: List[bool]) -> List[dict]:
     """
     Generate detailed information for each parking slot
     
     Args:
-        parking_rectangles: List of (x1, y1, x2, y2) tuples
+        parking_rectangles: (N, 4) array or list of (x1, y1, x2, y2) tuples
         occupancy: List of boolean values
     
     Returns:
@@ -79,20 +95,20 @@ def generate_slot_details(parking_rectangles: List[Tuple[int, int, int, int]],
     """
     slots_details = []
     
-    for i, (rect, is_occupied) in enumerate(zip(parking_rectangles, occupancy), 1):
-        x1, y1, x2, y2 = rect
-        
+    slots = _slot_geometry(parking_rectangles).tolist()
+    
+    for i, ((x1, y1, x2, y2, width, height), is_occupied) in enumerate(zip(slots, occupancy), 1):
         slot_info = {
             'slot_number': i,
             'rectangle': {
-                'x1': int(x1),
-                'y1': int(y1),
-                'x2': int(x2),
-                'y2': int(y2)
+                'x1': x1,
+                'y1': y1,
+                'x2': x2,
+                'y2': y2
             },
             'dimensions': {
-                'width': int(x2 - x1),
-                'height': int(y2 - y1)
+                'width': width,
+                'height': height
             },
             'occupied': bool(is_occupied),
             'status': 'OCCUPIED' if is_occupied else 'EMPTY'